@@ -0,0 +1,33 @@
+"""Keg DATE pin parsing compared to dateutil
+
+Run with: python -m benchmarks.dates
+"""
+import timeit
+
+import dateutil.parser
+
+from pyplaato.models.dates import parse_date
+
+NUMBER = 20000
+VALUE = "10/1/2022"
+
+
+def _time(stmt) -> float:
+    """Microseconds per call"""
+    return timeit.timeit(stmt, number=NUMBER) / NUMBER * 1e6
+
+
+def main():
+    results = {
+        "dateutil.parser.parse us": _time(
+            lambda: dateutil.parser.parse(VALUE)),
+        "parse_date uncached us": _time(
+            lambda: parse_date.__wrapped__(VALUE)),
+        "parse_date cached us": _time(lambda: parse_date(VALUE)),
+    }
+    for name, value in results.items():
+        print(f"{name:>28}: {value:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
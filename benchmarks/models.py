@@ -0,0 +1,58 @@
+"""Memory and access cost of the Plaato models
+
+Run with: python -m benchmarks.models
+"""
+import timeit
+import tracemalloc
+
+from pyplaato.models.airlock import PlaatoAirlock
+from pyplaato.models.keg import PlaatoKeg
+
+SNAPSHOTS = 10000
+NUMBER = 100000
+
+KEG = {pin: "1" for pin in PlaatoKeg.pins()}
+AIRLOCK = {pin: "1" for pin in PlaatoAirlock.pins()}
+
+
+def _memory(model, attrs) -> float:
+    """Bytes allocated per snapshot"""
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    snapshots = [model(attrs) for _ in range(SNAPSHOTS)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del snapshots
+    return (end - start) / SNAPSHOTS
+
+
+def _time(stmt) -> float:
+    """Nanoseconds per call"""
+    return timeit.timeit(stmt, number=NUMBER) / NUMBER * 1e9
+
+
+def main():
+    keg = PlaatoKeg(KEG)
+    airlock = PlaatoAirlock(AIRLOCK)
+    results = {
+        "keg bytes/snapshot": _memory(PlaatoKeg, KEG),
+        "airlock bytes/snapshot": _memory(PlaatoAirlock, AIRLOCK),
+        "keg construct ns": _time(lambda: PlaatoKeg(KEG)),
+        "airlock construct ns": _time(lambda: PlaatoAirlock(AIRLOCK)),
+        "keg.og ns": _time(lambda: keg.og),
+        "airlock.og ns": _time(lambda: airlock.og),
+        "keg.get_sensor_name ns": _time(
+            lambda: keg.get_sensor_name(PlaatoKeg.Pins.BEER_LEFT)),
+        "keg.get_unit_of_measurement ns": _time(
+            lambda: keg.get_unit_of_measurement(PlaatoKeg.Pins.BEER_LEFT)),
+        "airlock.get_sensor_name ns": _time(
+            lambda: airlock.get_sensor_name(PlaatoAirlock.Pins.BPM)),
+        "keg.binary_sensors ns": _time(lambda: keg.binary_sensors),
+        "airlock.sensors ns": _time(lambda: airlock.sensors),
+    }
+    for name, value in results.items():
+        print(f"{name:>32}: {value:10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""pytest-benchmark suite of the client and model hot paths
+
+Run with: python -m pytest benchmarks --benchmark-autosave
+Compare with the last stored run:
+    python -m pytest benchmarks --benchmark-compare \
+        --benchmark-compare-fail=mean:10%
+"""
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from pyplaato.const import ATTR_BATCH_VOLUME, ATTR_BEER_LEFT, ATTR_BPM, \
+    ATTR_OG, ATTR_PERCENT_BEER_LEFT, ATTR_POURING, ATTR_SG, ATTR_TEMP
+from pyplaato.decode import decode_pin_value, default_loads
+from pyplaato.mock import MockBlynkServer
+from pyplaato.models.airlock import PlaatoAirlock
+from pyplaato.models.keg import PlaatoKeg
+from pyplaato.plaato import Plaato
+from pyplaato.session import create_session
+
+KEG = {
+    PlaatoKeg.Pins.BEER_NAME: "Lager",
+    PlaatoKeg.Pins.PERCENT_BEER_LEFT: "75.5",
+    PlaatoKeg.Pins.POURING: "0",
+    PlaatoKeg.Pins.BEER_LEFT: "12.34",
+    PlaatoKeg.Pins.BEER_LEFT_UNIT: "L",
+    PlaatoKeg.Pins.TEMPERATURE: "4.5",
+    PlaatoKeg.Pins.UNIT_TYPE: "1",
+    PlaatoKeg.Pins.MEASURE_UNIT: "1",
+    PlaatoKeg.Pins.MASS_UNIT: "kg",
+    PlaatoKeg.Pins.VOLUME_UNIT: "L",
+    PlaatoKeg.Pins.LAST_POUR: "0.4",
+    PlaatoKeg.Pins.DATE: "10/1/2022",
+    PlaatoKeg.Pins.OG: "1.050",
+    PlaatoKeg.Pins.FG: "1.010",
+    PlaatoKeg.Pins.ABV: "5.25",
+    PlaatoKeg.Pins.FIRMWARE_VERSION: "2.0.10",
+    PlaatoKeg.Pins.LEAK_DETECTION: "0",
+    PlaatoKeg.Pins.MODE: "1",
+}
+AIRLOCK = {
+    PlaatoAirlock.Pins.BPM: "12",
+    PlaatoAirlock.Pins.TEMPERATURE: "19.5",
+    PlaatoAirlock.Pins.BATCH_VOLUME: "20",
+    PlaatoAirlock.Pins.OG: "1.050",
+    PlaatoAirlock.Pins.SG: "1.020",
+    PlaatoAirlock.Pins.ABV: "3.94",
+    PlaatoAirlock.Pins.TEMPERATURE_UNIT: "°C",
+    PlaatoAirlock.Pins.VOLUME_UNIT: "L",
+    PlaatoAirlock.Pins.BUBBLES: "12345",
+    PlaatoAirlock.Pins.CO2_VOLUME: "4.2",
+}
+KEG_WEB_HOOK = {
+    ATTR_PERCENT_BEER_LEFT: "75.5", ATTR_POURING: "0",
+    ATTR_BEER_LEFT: "12.34", ATTR_TEMP: "4.5", ATTR_OG: "1.050",
+}
+AIRLOCK_WEB_HOOK = {
+    ATTR_BPM: "12", ATTR_TEMP: "19.5", ATTR_BATCH_VOLUME: "20",
+    ATTR_OG: "1.050", ATTR_SG: "1.020",
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Event loop, session and Plaato running against a local server"""
+    loop = asyncio.new_event_loop()
+    server = MockBlynkServer()
+    loop.run_until_complete(server.start())
+    session = loop.run_until_complete(_create_session())
+    yield loop, session, Plaato("token", server.url, session=session)
+    loop.run_until_complete(session.close())
+    loop.run_until_complete(server.stop())
+    loop.close()
+
+
+async def _create_session():
+    return create_session()
+
+
+def test_get_keg_data(benchmark, client):
+    loop, session, plaato = client
+    keg = benchmark(lambda: loop.run_until_complete(
+        plaato.get_keg_data(session)))
+    assert keg.name == "Beer token"
+
+
+def test_get_airlock_data(benchmark, client):
+    loop, session, plaato = client
+    airlock = benchmark(lambda: loop.run_until_complete(
+        plaato.get_airlock_data(session)))
+    assert airlock.sg is not None
+
+
+def test_fetch_data(benchmark, client):
+    loop, session, plaato = client
+    value = benchmark(lambda: loop.run_until_complete(
+        plaato.fetch_data(session, PlaatoKeg.Pins.BEER_NAME)))
+    assert value == "Beer token"
+
+
+def test_decode(benchmark):
+    loads = default_loads()
+    body = json.dumps(["12.34"]).encode()
+    assert benchmark(lambda: decode_pin_value(loads(body))) == "12.34"
+
+
+@pytest.mark.parametrize("model, attrs", [
+    (PlaatoKeg, KEG), (PlaatoAirlock, AIRLOCK)
+], ids=["keg", "airlock"])
+def test_construct(benchmark, model, attrs):
+    benchmark(model, attrs)
+
+
+@pytest.mark.parametrize("prop", ["sensors", "binary_sensors", "attributes"])
+@pytest.mark.parametrize("device", [
+    PlaatoKeg(KEG), PlaatoAirlock(AIRLOCK)
+], ids=["keg", "airlock"])
+def test_properties(benchmark, device, prop):
+    benchmark(getattr, device, prop)
+
+
+@pytest.mark.parametrize("device, pin", [
+    (PlaatoKeg(KEG), PlaatoKeg.Pins.BEER_LEFT),
+    (PlaatoAirlock(AIRLOCK), PlaatoAirlock.Pins.BPM),
+], ids=["keg", "airlock"])
+def test_get_sensor_name(benchmark, device, pin):
+    assert benchmark(device.get_sensor_name, pin)
+
+
+@pytest.mark.parametrize("model, data", [
+    (PlaatoKeg, KEG_WEB_HOOK), (PlaatoAirlock, AIRLOCK_WEB_HOOK)
+], ids=["keg", "airlock"])
+def test_from_web_hook(benchmark, model, data):
+    benchmark(model.from_web_hook, data)
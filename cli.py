@@ -1,65 +1,198 @@
 import argparse
+import csv
+import json
+import math
 import sys
+import time
 
-import aiohttp
 import asyncio
 
 from datetime import datetime
+from pyplaato.fleet import PlaatoFleet
+from pyplaato.models.keg import PlaatoKeg
+from pyplaato.models.registry import MODELS
 from pyplaato.plaato import (
-    Plaato,
+    PlaatoDevice,
     PlaatoDeviceType
 )
 
+DEVICE_TYPES = {
+    'keg': PlaatoDeviceType.Keg,
+    'airlock': PlaatoDeviceType.Airlock,
+}
+FIELDS = ['timestamp', 'device_id', 'device_type', 'name', 'firmware_version']
 
-async def go(args):
-    headers = {}
-    if args.api_key:
-        headers["x-api-key"] = args.api_key
-    plaato = Plaato(args.auth_token, args.url, headers)
-
-    async with aiohttp.ClientSession() as session:
-        if args.device == 'keg':
-            device_type = PlaatoDeviceType.Keg
-        if args.device == 'airlock':
-            device_type = PlaatoDeviceType.Airlock
-        result = await plaato.get_data(session, device_type)
-        print(f"Device type: {result.device_type}")
-        print(f"Name: {result.name}")
-        print(f"Firmware: {result.firmware_version}")
-        print(f"Date: {datetime.fromtimestamp(result.date).strftime('%x')}")
-        print("Sensors:")
+
+def read_inventory(path) -> list:
+    """Reads (auth token, device type, device id) from an inventory file
+
+    Each line holds an auth token, a device type and optionally a device id
+    used in the output instead of the token, separated by commas or spaces.
+    Empty lines and lines starting with # are skipped.
+    """
+    devices = []
+    with open(path) as file:
+        for number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = line.replace(',', ' ').split()
+            if len(fields) < 2 or fields[1].lower() not in DEVICE_TYPES:
+                raise ValueError(f"{path}:{number}: expected "
+                                 f"'<auth_token> <keg|airlock> [device_id]'")
+            auth_token, device = fields[0], fields[1].lower()
+            device_id = fields[2] if len(fields) > 2 else auth_token
+            devices.append((auth_token, DEVICE_TYPES[device], device_id))
+    return devices
+
+
+def to_record(device_id: str, device: PlaatoDevice, timestamp: float) -> dict:
+    """Flattens a device into a record
+
+    The record is keyed by FIELDS, the names of the sensor pins and their
+    units, the names of the binary sensor pins and the attribute labels.
+    The keg date is an ISO date, or None if the pin is missing.
+    """
+    record = {
+        'timestamp': timestamp,
+        'device_id': device_id,
+        'device_type': device.device_type.value,
+        'name': device.name,
+        'firmware_version': device.firmware_version,
+    }
+    for pin, value in device.sensors.items():
+        name = pin.name.lower()
+        record[name] = value
+        record[f"{name}_unit"] = device.get_unit_of_measurement(pin)
+    for pin, value in device.binary_sensors.items():
+        record[pin.name.lower()] = value
+    for label, value in device.attributes.items():
+        record[label.lower().replace(' ', '_')] = value
+    if isinstance(device, PlaatoKeg):
+        keg_date = device.keg_date
+        record['keg_date'] = None if keg_date is None \
+            else datetime.fromtimestamp(keg_date).date().isoformat()
+    return record
+
+
+class Output(object):
+    """Writes polled devices as text, JSON lines or CSV"""
+
+    def __init__(self, output_format, device_types, file=sys.stdout):
+        self.__format = output_format
+        self.__file = file
+        self.__writer = None
+        if output_format == 'csv':
+            fields = list(FIELDS)
+            for device_type in device_types:
+                empty = MODELS[device_type]({})
+                for field in to_record('', empty, 0):
+                    if field not in fields:
+                        fields.append(field)
+            self.__writer = csv.DictWriter(
+                file, fields, extrasaction='ignore')
+            self.__writer.writeheader()
+
+    def write(self, device_id: str, device: PlaatoDevice, timestamp: float):
+        if self.__format == 'json':
+            print(json.dumps(to_record(device_id, device, timestamp),
+                             default=str), file=self.__file)
+        elif self.__format == 'csv':
+            self.__writer.writerow(to_record(device_id, device, timestamp))
+        else:
+            self._write_text(device_id, device)
+        self.__file.flush()
+
+    def _write_text(self, device_id: str, result: PlaatoDevice):
+        file = self.__file
+        print(f"Device: {device_id}", file=file)
+        print(f"Device type: {result.device_type}", file=file)
+        print(f"Name: {result.name}", file=file)
+        print(f"Firmware: {result.firmware_version}", file=file)
+        if result.date is not None:
+            print(f"Date: {datetime.fromtimestamp(result.date).strftime('%x')}", file=file)
+        print("Sensors:", file=file)
         for key, attr in result.sensors.items():
-            print(f"\t{result.get_sensor_name(key)}: {attr} {result.get_unit_of_measurement(key)}")
-        print("Binary Sensors:")
+            print(f"\t{result.get_sensor_name(key)}: {attr} {result.get_unit_of_measurement(key)}", file=file)
+        print("Binary Sensors:", file=file)
         for key, attr in result.binary_sensors.items():
-            print(f"\t{result.get_sensor_name(key)}: {attr}")
-        print("Attributes:")
+            print(f"\t{result.get_sensor_name(key)}: {attr}", file=file)
+        print("Attributes:", file=file)
         for key, attr in result.attributes.items():
-            print(f"\t{key}: {attr}")
+            print(f"\t{key}: {attr}", file=file)
+
+
+async def go(args, file=sys.stdout):
+    devices = []
+    if args.inventory:
+        devices.extend(read_inventory(args.inventory))
+    for auth_token in args.auth_token or []:
+        devices.append((auth_token, DEVICE_TYPES[args.device], auth_token))
+    device_ids = {auth_token: device_id for auth_token, _, device_id in devices}
+
+    headers = {}
+    if args.api_key:
+        headers["x-api-key"] = args.api_key
+    fleet = PlaatoFleet(
+        [(auth_token, device_type) for auth_token, device_type, _ in devices],
+        url=args.url or None, headers=headers, jitter=0
+    )
+    output = Output(args.output, {device_type for _, device_type, _ in devices},
+                    file)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tick = 0
+    async with fleet.create_session() as session:
+        while True:
+            async for auth_token, device in fleet.as_completed(session):
+                if device is None:
+                    print(f"Failed to poll {device_ids[auth_token]}",
+                          file=sys.stderr)
+                    continue
+                output.write(device_ids[auth_token], device, time.time())
+            if not args.watch:
+                break
+            # Keep to a fixed schedule however long a round takes
+            tick = max(tick + 1, math.ceil((loop.time() - start) / args.watch))
+            await asyncio.sleep(start + tick * args.watch - loop.time())
 
 
 def main():
     parser = argparse.ArgumentParser()
-    required_argument = parser.add_argument_group('required arguments')
     optional_argument = parser.add_argument_group('optional arguments')
-    required_argument.add_argument('-t', dest='auth_token',
-                                   help='Auth token received from Plaato',
-                                   required=True)
-    required_argument.add_argument('-d',
+    optional_argument.add_argument('-t', dest='auth_token',
+                                   action='append',
+                                   help='Auth token received from Plaato, '
+                                        'can be given several times')
+    optional_argument.add_argument('-d',
                                    action='store',
                                    dest='device',
                                    choices=['keg', 'airlock'],
-                                   required=True)
+                                   help='Device type, required with -t')
+    optional_argument.add_argument('-i', dest='inventory',
+                                   help='File with one '
+                                        '"<auth_token> <keg|airlock> '
+                                        '[device_id]" per line')
+    optional_argument.add_argument('-w', '--watch', dest='watch', type=float,
+                                   help='Poll again every WATCH seconds')
+    optional_argument.add_argument('-o', dest='output',
+                                   choices=['text', 'json', 'csv'],
+                                   default='text',
+                                   help='Output format, json writes one '
+                                        'object per line')
     optional_argument.add_argument('-u', dest='url',
                                    help='Mock url')
     optional_argument.add_argument('-k', dest='api_key',
                                    help='Header key for mock url')
 
     args = parser.parse_args()
+    if not args.auth_token and not args.inventory:
+        parser.error('-t or -i is required')
+    if args.auth_token and not args.device:
+        parser.error('-d is required with -t')
 
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(go(args))
-    loop.close()
+    asyncio.run(go(args))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,179 @@
+"""Fermentation analytics over the history of many Airlocks at once
+
+Requires numpy, install with pip install pyplaato[analytics]
+"""
+from enum import IntEnum
+from typing import Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "pyplaato.analytics requires numpy, "
+        "install it with pip install pyplaato[analytics]") from e
+
+from .const import DEFAULT_ACTIVE_BPM, DEFAULT_IDLE_BPM, \
+    DEFAULT_MOVING_AVERAGE_WINDOW
+from .history import DeviceHistory
+from .models.airlock import PlaatoAirlock
+from .models.pins import PinsBase
+
+
+class FermentationPhase(IntEnum):
+    LAG = 0
+    ACTIVE = 1
+    SLOWING = 2
+    FINISHED = 3
+
+
+def stack(
+        histories: Sequence[DeviceHistory], pin: PinsBase,
+        start: Optional[float] = None, end: Optional[float] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Stacks a pin of several histories into 2D arrays, one row per device
+
+    Rows are right aligned so the latest reading of every device is in the
+    last column, shorter rows are padded with NaN at the start.
+
+    :return: Timestamps and values, both shaped (devices, readings)
+    """
+    columns = [
+        (np.frombuffer(history.timestamps(start, end)),
+         np.frombuffer(history.column(pin, start, end)))
+        for history in histories
+    ]
+    length = max((len(values) for _, values in columns), default=0)
+    timestamps = np.full((len(columns), length), np.nan)
+    values = np.full((len(columns), length), np.nan)
+    for row, (row_timestamps, row_values) in enumerate(columns):
+        if len(row_values):
+            timestamps[row, -len(row_values):] = row_timestamps
+            values[row, -len(row_values):] = row_values
+    return timestamps, values
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the last window readings at every reading, NaN are skipped"""
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0), axis=-1)
+    counts = np.cumsum(valid, axis=-1)
+    shape = values.shape[:-1] + (1,)
+    sums = np.concatenate((np.zeros(shape), sums), axis=-1)
+    counts = np.concatenate((np.zeros(shape), counts), axis=-1)
+
+    index = np.arange(values.shape[-1])
+    low = np.maximum(index + 1 - window, 0)
+    window_sums = sums[..., index + 1] - sums[..., low]
+    window_counts = counts[..., index + 1] - counts[..., low]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(window_counts > 0, window_sums / window_counts, np.nan)
+
+
+def phases(bpm: np.ndarray, active_bpm=DEFAULT_ACTIVE_BPM,
+           idle_bpm=DEFAULT_IDLE_BPM) -> np.ndarray:
+    """FermentationPhase at every reading of bubbles per minute
+
+    LAG until the bpm first reaches active_bpm, then ACTIVE while it stays
+    there, SLOWING while it is between idle_bpm and active_bpm and FINISHED
+    once it is below idle_bpm.
+    """
+    with np.errstate(invalid="ignore"):
+        active = bpm >= active_bpm
+        idle = bpm < idle_bpm
+    started = np.logical_or.accumulate(active, axis=-1)
+    return np.select(
+        [~started, active, idle],
+        [FermentationPhase.LAG, FermentationPhase.ACTIVE,
+         FermentationPhase.FINISHED],
+        FermentationPhase.SLOWING
+    ).astype(np.int8)
+
+
+def latest(values: np.ndarray) -> np.ndarray:
+    """Last value that is not NaN in every row, NaN for empty rows"""
+    if not values.shape[-1]:
+        return np.full(values.shape[:-1], np.nan)
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(values.shape[-1]), -1)
+    last = np.maximum.accumulate(index, axis=-1)[..., -1]
+    result = np.take_along_axis(
+        values, np.maximum(last, 0)[..., np.newaxis], axis=-1)[..., 0]
+    return np.where(last >= 0, result, np.nan)
+
+
+def attenuation(og: np.ndarray, sg: np.ndarray) -> np.ndarray:
+    """Apparent attenuation in percent"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (og - sg) / (og - 1) * 100
+
+
+def abv(og: np.ndarray, sg: np.ndarray) -> np.ndarray:
+    """Alcohol by volume in percent"""
+    return (og - sg) * 131.25
+
+
+def seconds_until_below(
+        timestamps: np.ndarray, values: np.ndarray, threshold: float,
+        window: int = DEFAULT_MOVING_AVERAGE_WINDOW
+) -> np.ndarray:
+    """Seconds until the values drop below threshold, per row
+
+    Follows a straight line fitted to the last window readings. Gives 0
+    when the latest value is already below and inf when the values are
+    not falling.
+    """
+    timestamps = timestamps[..., -window:]
+    values = values[..., -window:]
+    valid = ~np.isnan(values) & ~np.isnan(timestamps)
+    count = valid.sum(axis=-1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = np.where(valid, timestamps, 0.0)
+        y = np.where(valid, values, 0.0)
+        mean_x = x.sum(axis=-1) / count
+        mean_y = y.sum(axis=-1) / count
+        dx = np.where(valid, timestamps - mean_x[..., np.newaxis], 0.0)
+        dy = np.where(valid, values - mean_y[..., np.newaxis], 0.0)
+        slope = (dx * dy).sum(axis=-1) / (dx * dx).sum(axis=-1)
+
+        current = latest(values)
+        last_time = latest(timestamps)
+        crossing = mean_x + (threshold - mean_y) / slope
+        result = np.where(slope < 0, np.maximum(crossing - last_time, 0),
+                          np.inf)
+        result = np.where(current < threshold, 0.0, result)
+    return np.where(count > 1, result, np.nan)
+
+
+class FermentationReport(object):
+    """Analytics of several Airlocks, every array has one row per device"""
+
+    def __init__(
+            self, histories: Sequence[DeviceHistory],
+            start: Optional[float] = None, end: Optional[float] = None,
+            window=DEFAULT_MOVING_AVERAGE_WINDOW,
+            active_bpm=DEFAULT_ACTIVE_BPM, idle_bpm=DEFAULT_IDLE_BPM
+    ):
+        """
+        :param histories: Histories of Airlocks
+        :param window: Number of readings in the moving average and in the
+            trend used to project when activity stops
+        :param active_bpm: Bubbles per minute of an active fermentation
+        :param idle_bpm: Bubbles per minute below which it is finished
+        """
+        pins = PlaatoAirlock.Pins
+        self.timestamps, bpm = stack(histories, pins.BPM, start, end)
+        _, og = stack(histories, pins.OG, start, end)
+        _, sg = stack(histories, pins.SG, start, end)
+
+        self.bpm_average = moving_average(bpm, window)
+        self.phases = phases(self.bpm_average, active_bpm, idle_bpm)
+        if self.phases.shape[-1]:
+            self.phase = self.phases[..., -1]
+        else:
+            self.phase = np.full(
+                len(histories), FermentationPhase.LAG, np.int8)
+        self.attenuation = attenuation(latest(og), latest(sg))
+        self.abv = abv(latest(og), latest(sg))
+        self.seconds_until_idle = seconds_until_below(
+            self.timestamps, self.bpm_average, idle_bpm, window)
@@ -0,0 +1,91 @@
+"""Cache for pin values that rarely change"""
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .const import DEFAULT_CACHE_MAX_DEVICES, DEFAULT_METADATA_TTL
+from .models.airlock import PlaatoAirlock
+from .models.keg import PlaatoKeg
+from .models.pins import PinsBase
+
+# Seconds a pin value stays fresh, pins missing here are always fetched
+DEFAULT_PIN_TTL = {
+    PlaatoKeg.Pins.BEER_NAME: DEFAULT_METADATA_TTL,
+    PlaatoKeg.Pins.FIRMWARE_VERSION: DEFAULT_METADATA_TTL,
+    PlaatoKeg.Pins.OG: DEFAULT_METADATA_TTL,
+    PlaatoKeg.Pins.FG: DEFAULT_METADATA_TTL,
+    PlaatoKeg.Pins.ABV: DEFAULT_METADATA_TTL,
+    PlaatoKeg.Pins.DATE: DEFAULT_METADATA_TTL,
+    PlaatoKeg.Pins.MODE: DEFAULT_METADATA_TTL,
+    PlaatoKeg.Pins.BEER_LEFT_UNIT: DEFAULT_METADATA_TTL,
+    PlaatoKeg.Pins.UNIT_TYPE: DEFAULT_METADATA_TTL,
+    PlaatoKeg.Pins.MEASURE_UNIT: DEFAULT_METADATA_TTL,
+    PlaatoKeg.Pins.MASS_UNIT: DEFAULT_METADATA_TTL,
+    PlaatoKeg.Pins.VOLUME_UNIT: DEFAULT_METADATA_TTL,
+    PlaatoAirlock.Pins.OG: DEFAULT_METADATA_TTL,
+    PlaatoAirlock.Pins.BATCH_VOLUME: DEFAULT_METADATA_TTL,
+    PlaatoAirlock.Pins.TEMPERATURE_UNIT: DEFAULT_METADATA_TTL,
+    PlaatoAirlock.Pins.VOLUME_UNIT: DEFAULT_METADATA_TTL,
+}
+
+
+class PinCache(object):
+    """LRU cache of pin values per device where each pin has its own TTL
+
+    One cache can be shared between several Plaato instances
+    """
+
+    def __init__(self, max_devices=DEFAULT_CACHE_MAX_DEVICES,
+                 ttl: Optional[dict] = None, clock=time.monotonic):
+        """
+        :param max_devices: Number of devices to keep before the least
+            recently used one is evicted
+        :param ttl: Seconds each pin stays fresh, defaults to DEFAULT_PIN_TTL
+        :param clock: Function returning the current time in seconds
+        """
+        self.__max_devices = max_devices
+        self.__ttl = DEFAULT_PIN_TTL if ttl is None else ttl
+        self.__clock = clock
+        self.__devices = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.__devices)
+
+    def is_cacheable(self, pin: PinsBase) -> bool:
+        return self.__ttl.get(pin, 0) > 0
+
+    def get(self, device: str, pin: PinsBase):
+        """Returns the cached value or None if it is missing or stale"""
+        if not self.is_cacheable(pin):
+            return None
+
+        values = self.__devices.get(device, None)
+        if values is not None:
+            self.__devices.move_to_end(device)
+            value, expires = values.get(pin, (None, 0))
+            if value is not None and expires > self.__clock():
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, device: str, pin: PinsBase, value):
+        if value is None or not self.is_cacheable(pin):
+            return
+
+        values = self.__devices.get(device, None)
+        if values is None:
+            values = self.__devices[device] = {}
+            if len(self.__devices) > self.__max_devices:
+                self.__devices.popitem(last=False)
+        else:
+            self.__devices.move_to_end(device)
+        values[pin] = (value, self.__clock() + self.__ttl[pin])
+
+    def clear(self):
+        self.__devices.clear()
+        self.hits = 0
+        self.misses = 0
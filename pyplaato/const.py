@@ -1,5 +1,69 @@
 URL = "http://plaato.blynk.cc/{auth_token}/get"
 
+# Client
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 10
+
+# Retry
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_RETRY_BASE_DELAY = 0.5
+DEFAULT_RETRY_MAX_DELAY = 30
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 60
+
+# Session
+DEFAULT_POOL_LIMIT = 100
+DEFAULT_LIMIT_PER_HOST = 32
+DEFAULT_KEEPALIVE_TIMEOUT = 60
+DEFAULT_DNS_CACHE_TTL = 300
+
+# Fleet
+DEFAULT_MAX_IN_FLIGHT = 64
+DEFAULT_JITTER = 1.0
+
+# Cache
+DEFAULT_CACHE_MAX_DEVICES = 1024
+DEFAULT_METADATA_TTL = 6 * 60 * 60
+
+# Watcher
+DEFAULT_WATCH_INTERVAL = 30
+DEFAULT_WATCH_ACTIVE_INTERVAL = 2
+DEFAULT_WATCH_IDLE_INTERVAL = 120
+DEFAULT_WATCH_IDLE_AFTER = 10
+
+# Stream
+DEFAULT_STREAM_INTERVAL = 30
+DEFAULT_STREAM_BUFFER_SIZE = 16
+
+# Scheduler
+DEFAULT_PIN_MIN_INTERVAL = 2
+DEFAULT_PIN_MAX_INTERVAL = 600
+DEFAULT_PIN_MERGE_WINDOW = 1
+DEFAULT_CHANGE_SMOOTHING = 0.3
+
+# History
+DEFAULT_HISTORY_CAPACITY = 7 * 24 * 60
+
+# Analytics
+DEFAULT_MOVING_AVERAGE_WINDOW = 15
+DEFAULT_ACTIVE_BPM = 10
+DEFAULT_IDLE_BPM = 1
+
+# Pours
+DEFAULT_REFILL_PERCENT = 10
+
+# Snapshots
+DEFAULT_SNAPSHOT_BUFFER_SIZE = 64 * 1024
+
+# Webhook
+DEFAULT_WEBHOOK_PATH = "/plaato"
+DEFAULT_WEBHOOK_QUEUE_SIZE = 1000
+DEFAULT_WEBHOOK_PUT_TIMEOUT = 5
+
+# Metrics
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
 # Units
 UNIT_TEMP_CELSIUS = "°C"
 UNIT_TEMP_FAHRENHEIT = "°F"
@@ -22,4 +86,18 @@ ATTR_OG = "og"
 ATTR_BUBBLES = "bubbles"
 ATTR_ABV = "abv"
 ATTR_CO2_VOLUME = "co2_volume"
-ATTR_BATCH_VOLUME = "batch_volume"
\ No newline at end of file
+ATTR_BATCH_VOLUME = "batch_volume"
+ATTR_BEER_NAME = "beer_name"
+ATTR_PERCENT_BEER_LEFT = "percent_beer_left"
+ATTR_POURING = "pouring"
+ATTR_BEER_LEFT = "beer_left"
+ATTR_BEER_LEFT_UNIT = "beer_left_unit"
+ATTR_UNIT_TYPE = "unit_type"
+ATTR_MEASURE_UNIT = "measure_unit"
+ATTR_MASS_UNIT = "mass_unit"
+ATTR_LAST_POUR = "last_pour"
+ATTR_DATE = "date"
+ATTR_FG = "fg"
+ATTR_FIRMWARE_VERSION = "firmware_version"
+ATTR_LEAK_DETECTION = "leak_detection"
+ATTR_MODE = "mode"
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""Decoding of pin responses"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def default_loads():
+    """orjson.loads if installed, otherwise json.loads"""
+    if orjson is not None:
+        return orjson.loads
+    return json.loads
+
+
+def decode_pin_value(data):
+    """Gets the value out of a decoded pin response
+
+    The server answers with a single value list like ["23.4"], or with an
+    object like {"error": "..."} when the pin is not found.
+
+    :return: The value or None if there is none
+    """
+    data_type = type(data)
+    if data_type is list:
+        return data[0] if len(data) == 1 else None
+    if data_type is dict:
+        return None
+    return data
@@ -0,0 +1,157 @@
+"""Poll many Plaato Airlocks and Kegs over one shared session"""
+import asyncio
+import logging
+import random
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterable, \
+    Optional, Tuple
+
+from .cache import PinCache
+from .metrics import PlaatoHooks
+from .const import DEFAULT_FAILURE_THRESHOLD, DEFAULT_JITTER, \
+    DEFAULT_LIMIT_PER_HOST, DEFAULT_MAX_IN_FLIGHT, DEFAULT_RESET_TIMEOUT, \
+    DEFAULT_TIMEOUT, URL
+from .models.device import PlaatoDevice, PlaatoDeviceType
+from .plaato import Plaato
+from .retry import CircuitBreaker, RetryPolicy
+from .session import create_session
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+
+class PlaatoFleet(object):
+    """Represents a fleet of Plaato devices
+
+    A session can be passed to each call or once to the constructor. Without
+    either, a session matching the fleet's limits is created on first use,
+    kept between polls and closed by close() or when leaving the async
+    context manager.
+    """
+
+    def __init__(
+            self, devices: Iterable[Tuple[str, PlaatoDeviceType]],
+            url=URL, headers=None,
+            max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+            limit_per_host=DEFAULT_LIMIT_PER_HOST,
+            jitter=DEFAULT_JITTER, timeout=DEFAULT_TIMEOUT,
+            cache: Optional[PinCache] = None,
+            retry: Optional[RetryPolicy] = None,
+            failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+            reset_timeout=DEFAULT_RESET_TIMEOUT,
+            hooks: Optional[PlaatoHooks] = None,
+            session: Optional["ClientSession"] = None
+    ):
+        """
+        :param devices: Pairs of auth token and device type to poll
+        :param max_in_flight: Max number of requests in flight for the
+            whole fleet
+        :param limit_per_host: Max number of connections per host, only used
+            when the fleet creates its own session
+        :param jitter: Max seconds to delay the start of each device poll
+        :param timeout: Seconds to wait for a single request before giving up
+        :param cache: Cache for pins that rarely change
+        :param retry: Policy for retrying failed requests
+        :param failure_threshold: Consecutive failures after which a device
+            is skipped until reset_timeout seconds have passed
+        :param hooks: Instrumentation shared by every device
+        :param session: Session used when none is passed to a call
+        """
+        self.__devices = list(devices)
+        self.__url = url
+        self.__headers = headers
+        self.__max_in_flight = max_in_flight
+        self.__limit_per_host = limit_per_host
+        self.__jitter = jitter
+        self.__timeout = timeout
+        self.__cache = cache
+        self.__retry = retry
+        self.__hooks = hooks
+        self.__session = session
+        self.__owns_session = False
+        self.__breakers = {
+            auth_token: CircuitBreaker(failure_threshold, reset_timeout)
+            for auth_token, _ in self.__devices
+        }
+
+    @property
+    def devices(self) -> list:
+        return list(self.__devices)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """Closes the session if it was created by the fleet"""
+        if self.__owns_session:
+            await self.__session.close()
+            self.__session = None
+            self.__owns_session = False
+
+    def _get_session(self, session: Optional["ClientSession"]) -> "ClientSession":
+        if session is not None:
+            return session
+        if self.__session is None:
+            self.__session = self.create_session()
+            self.__owns_session = True
+        return self.__session
+
+    def create_session(self) -> "ClientSession":
+        """Creates a session with connection limits matching the fleet"""
+        return create_session(
+            limit=self.__max_in_flight,
+            limit_per_host=self.__limit_per_host
+        )
+
+    async def poll(
+            self, session: Optional["ClientSession"] = None
+    ) -> Dict[str, Optional[PlaatoDevice]]:
+        """Polls every device and returns the results keyed by auth token"""
+        result = {}
+        async for auth_token, device in self.as_completed(session):
+            result[auth_token] = device
+        return result
+
+    async def as_completed(
+            self, session: Optional["ClientSession"] = None
+    ) -> AsyncIterator[Tuple[str, Optional[PlaatoDevice]]]:
+        """Polls every device and yields each result as soon as it is done
+
+        A device that could not be polled is yielded as None
+        """
+        session = self._get_session(session)
+        limiter = asyncio.Semaphore(self.__max_in_flight)
+        tasks = [
+            asyncio.ensure_future(
+                self._poll_device(session, limiter, auth_token, device_type))
+            for auth_token, device_type in self.__devices
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _poll_device(
+            self, session: "ClientSession", limiter: asyncio.Semaphore,
+            auth_token: str, device_type: PlaatoDeviceType
+    ) -> Tuple[str, Optional[PlaatoDevice]]:
+        if self.__jitter:
+            await asyncio.sleep(random.uniform(0, self.__jitter))
+
+        plaato = Plaato(
+            auth_token, self.__url, self.__headers,
+            timeout=self.__timeout, limiter=limiter, cache=self.__cache,
+            retry=self.__retry, breaker=self.__breakers[auth_token],
+            hooks=self.__hooks
+        )
+        try:
+            return auth_token, await plaato.get_data(session, device_type)
+        except Exception as e:
+            logging.getLogger(__name__) \
+                .warning(f"Failed to poll {device_type} - {e}")
+            return auth_token, None
@@ -0,0 +1,187 @@
+"""Fixed size history of Plaato Airlock and Keg readings"""
+import math
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .const import DEFAULT_HISTORY_CAPACITY
+from .models.device import PlaatoDevice, PlaatoDeviceType
+from .models.pins import PinsBase
+from .models.registry import MODELS
+
+
+def _to_float(value) -> float:
+    if value is None:
+        return math.nan
+    if value is True or value is False:
+        return 1.0 if value else 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class DeviceHistory(object):
+    """Ring buffer of the numeric readings of one device
+
+    Each pin is stored in its own array of floats, so memory stays fixed at
+    capacity * (number of pins + 1) * 8 bytes. Missing or non numeric
+    values are stored as NaN. Readings must be appended in time order.
+    The arrays returned support the buffer protocol, e.g. numpy.frombuffer.
+    """
+
+    def __init__(self, device_type: PlaatoDeviceType,
+                 capacity=DEFAULT_HISTORY_CAPACITY,
+                 pins: Optional[Iterable[PinsBase]] = None):
+        """
+        :param capacity: Number of readings kept before the oldest is dropped
+        :param pins: Pins to keep, defaults to the sensors and binary
+            sensors of the device
+        """
+        if pins is None:
+            empty = MODELS[device_type]({})
+            pins = list(empty.sensors) + list(empty.binary_sensors)
+        self.__capacity = capacity
+        self.__timestamps = array('d', [math.nan]) * capacity
+        self.__columns = {
+            pin: array('d', [math.nan]) * capacity for pin in pins
+        }
+        self.__next = 0
+        self.__size = 0
+
+    def __len__(self):
+        return self.__size
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def pins(self) -> list:
+        return list(self.__columns)
+
+    def append(self, device: PlaatoDevice, timestamp: Optional[float] = None):
+        """Adds the sensor and binary sensor values of a device"""
+        values = device.sensors
+        values.update(device.binary_sensors)
+        self.append_values(values, timestamp)
+
+    def append_values(self, values: Dict[PinsBase, object],
+                      timestamp: Optional[float] = None):
+        """Adds raw pin values, such as returned by Plaato.fetch_pins
+
+        :param timestamp: Seconds since the epoch, defaults to now
+        :raises ValueError: If timestamp is older than the last reading
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if self.__size and timestamp < self.__timestamps[self.__next - 1]:
+            raise ValueError("Readings must be appended in time order")
+
+        index = self.__next
+        self.__timestamps[index] = timestamp
+        for pin, column in self.__columns.items():
+            column[index] = _to_float(values.get(pin, None))
+        self.__next = (index + 1) % self.__capacity
+        self.__size = min(self.__size + 1, self.__capacity)
+
+    def timestamps(self, start: Optional[float] = None,
+                   end: Optional[float] = None) -> array:
+        """Timestamps of the readings from start up to, not including, end"""
+        return self._slice(self.__timestamps, *self._range(start, end))
+
+    def column(self, pin: PinsBase, start: Optional[float] = None,
+               end: Optional[float] = None) -> array:
+        """Values of a pin from start up to, not including, end"""
+        return self._slice(self.__columns[pin], *self._range(start, end))
+
+    def latest(self, pin: PinsBase) -> float:
+        if not self.__size:
+            return math.nan
+        return self.__columns[pin][self.__next - 1]
+
+    def downsample(self, pin: PinsBase, bucket: float,
+                   start: Optional[float] = None,
+                   end: Optional[float] = None) -> List[Tuple[float, float]]:
+        """Mean value of a pin per bucket of time
+
+        :param bucket: Seconds covered by each bucket
+        :return: (bucket start, mean) for every bucket holding a value
+        """
+        result = []
+        bucket_start = None
+        total = 0.0
+        count = 0
+        for timestamp, value in zip(self.timestamps(start, end),
+                                    self.column(pin, start, end)):
+            if math.isnan(value):
+                continue
+            key = timestamp - timestamp % bucket
+            if key != bucket_start:
+                if count:
+                    result.append((bucket_start, total / count))
+                bucket_start, total, count = key, 0.0, 0
+            total += value
+            count += 1
+        if count:
+            result.append((bucket_start, total / count))
+        return result
+
+    def _physical(self, index: int) -> int:
+        return (self.__next - self.__size + index) % self.__capacity
+
+    def _bisect(self, timestamp: float) -> int:
+        """Index of the first reading at or after timestamp"""
+        low, high = 0, self.__size
+        while low < high:
+            middle = (low + high) // 2
+            if self.__timestamps[self._physical(middle)] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _range(self, start: Optional[float],
+               end: Optional[float]) -> Tuple[int, int]:
+        low = 0 if start is None else self._bisect(start)
+        high = self.__size if end is None else self._bisect(end)
+        return low, max(low, high)
+
+    def _slice(self, values: array, low: int, high: int) -> array:
+        first = self._physical(0)
+        low += first
+        high += first
+        if high <= self.__capacity:
+            return values[low:high]
+        if low >= self.__capacity:
+            return values[low - self.__capacity:high - self.__capacity]
+        return values[low:] + values[:high - self.__capacity]
+
+
+class HistoryStore(object):
+    """Histories of many devices keyed by device id"""
+
+    def __init__(self, capacity=DEFAULT_HISTORY_CAPACITY):
+        """
+        :param capacity: Number of readings kept per device
+        """
+        self.__capacity = capacity
+        self.__histories = {}
+
+    def __len__(self):
+        return len(self.__histories)
+
+    def __contains__(self, device_id):
+        return device_id in self.__histories
+
+    def get(self, device_id, device_type: PlaatoDeviceType) -> DeviceHistory:
+        """Returns the history of a device, created if it is new"""
+        history = self.__histories.get(device_id, None)
+        if history is None:
+            history = self.__histories[device_id] = \
+                DeviceHistory(device_type, self.__capacity)
+        return history
+
+    def append(self, device_id, device: PlaatoDevice,
+               timestamp: Optional[float] = None):
+        self.get(device_id, device.device_type).append(device, timestamp)
@@ -0,0 +1,206 @@
+"""Load test of Plaato.get_data against a local mock server
+
+Run with: python -m pyplaato.loadtest --devices 100 --polls 10
+
+With --shards the devices are polled by a ShardedFleet from several
+processes, against a server running in --server-processes processes.
+"""
+import argparse
+import asyncio
+import math
+import time
+from typing import List, Optional
+
+from .mock import MockBlynkServer, MockServerPool
+from .models.device import PlaatoDeviceType
+from .plaato import Plaato
+from .session import create_session
+from .shards import ShardedFleet
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Nearest rank percentile, NaN if there are no values"""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class LoadTestResult(object):
+    """Outcome of a load test, latencies are in seconds"""
+
+    def __init__(self, latencies: List[float], failures: int,
+                 duration: float, requests: int,
+                 polls: Optional[int] = None):
+        """
+        :param latencies: Time taken by every get_data call, or by every
+            poll of the fleet
+        :param failures: Calls that returned a device with missing pins
+        :param duration: Seconds the whole test took
+        :param requests: Requests handled by the server
+        :param polls: Devices polled, one per latency if not set
+        """
+        self.latencies = latencies
+        self.failures = failures
+        self.duration = duration
+        self.requests = requests
+        self.__polls = polls
+
+    def __repr__(self):
+        return f"{self.__class__.__name__} -> " \
+               f"Polls: {self.polls}, " \
+               f"Throughput: {self.throughput:.1f}/s, " \
+               f"p50: {self.p50 * 1000:.1f} ms, " \
+               f"p99: {self.p99 * 1000:.1f} ms"
+
+    @property
+    def polls(self) -> int:
+        if self.__polls is not None:
+            return self.__polls
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        """Polls per second"""
+        if self.duration <= 0:
+            return 0.0
+        return self.polls / self.duration
+
+    @property
+    def p50(self) -> float:
+        return percentile(self.latencies, 50)
+
+    @property
+    def p99(self) -> float:
+        return percentile(self.latencies, 99)
+
+
+async def run_load_test(
+        server: MockBlynkServer, device_type=PlaatoDeviceType.Keg,
+        devices=10, polls=10, headers: Optional[dict] = None, **kwargs
+) -> LoadTestResult:
+    """Polls every device polls times through one shared session
+
+    Every device polls in its own loop, so up to devices calls of get_data
+    are in flight at once.
+
+    :param server: Started server to run against
+    :param kwargs: Passed on to Plaato, e.g. batch or concurrency
+    """
+    latencies = []
+    failures = 0
+    requests = server.requests
+
+    async def device_loop(session, auth_token: str):
+        nonlocal failures
+        plaato = Plaato(auth_token, server.url, headers, session=session,
+                        **kwargs)
+        for _ in range(polls):
+            start = time.perf_counter()
+            device = await plaato.get_data(session, device_type)
+            latencies.append(time.perf_counter() - start)
+            if any(value is None for value in device.sensors.values()):
+                failures += 1
+
+    start = time.perf_counter()
+    async with create_session() as session:
+        await asyncio.gather(*[
+            device_loop(session, f"device{index}")
+            for index in range(devices)
+        ])
+    return LoadTestResult(latencies, failures, time.perf_counter() - start,
+                          server.requests - requests)
+
+
+async def run_sharded_load_test(
+        url: str, device_type=PlaatoDeviceType.Keg, devices=10, polls=10,
+        shards: Optional[int] = None, headers: Optional[dict] = None,
+        **kwargs
+) -> LoadTestResult:
+    """Polls every device polls times through a ShardedFleet
+
+    The latencies are those of the polls of the whole fleet. The worker
+    processes are started before the clock starts.
+
+    :param url: Address of a running server
+    :param kwargs: Passed on to ShardedFleet, e.g. batch
+    """
+    tokens = [(f"device{index}", device_type) for index in range(devices)]
+    latencies = []
+    failures = 0
+    async with ShardedFleet(tokens, shards, url, headers, **kwargs) as fleet:
+        # The first poll pays for starting the processes
+        await fleet.poll_raw()
+        start = time.perf_counter()
+        for _ in range(polls):
+            poll_start = time.perf_counter()
+            result = await fleet.poll()
+            latencies.append(time.perf_counter() - poll_start)
+            failures += sum(
+                device is None
+                or any(value is None for value in device.sensors.values())
+                for device in result.values())
+        duration = time.perf_counter() - start
+    return LoadTestResult(latencies, failures, duration, 0, devices * polls)
+
+
+async def _run(args) -> LoadTestResult:
+    headers = {"x-api-key": args.api_key} if args.api_key else None
+    server = MockBlynkServer(args.latency, args.error_rate,
+                             api_key=args.api_key)
+    async with server:
+        return await run_load_test(
+            server, PlaatoDeviceType[args.device.capitalize()],
+            args.devices, args.polls, headers, batch=args.batch)
+
+
+def _run_sharded(args) -> LoadTestResult:
+    headers = {"x-api-key": args.api_key} if args.api_key else None
+    with MockServerPool(args.server_processes, args.latency, args.error_rate,
+                        args.api_key) as pool:
+        result = asyncio.run(run_sharded_load_test(
+            pool.url, PlaatoDeviceType[args.device.capitalize()],
+            args.devices, args.polls, args.shards, headers,
+            batch=args.batch))
+    # The warm-up poll is served too
+    result.requests = pool.requests
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-d', '--device', choices=['keg', 'airlock'],
+                        default='keg')
+    parser.add_argument('-n', '--devices', type=int, default=10,
+                        help='Number of devices polled at the same time')
+    parser.add_argument('-p', '--polls', type=int, default=10,
+                        help='Number of polls per device')
+    parser.add_argument('-l', '--latency', type=float, default=0.0,
+                        help='Seconds the server waits before answering')
+    parser.add_argument('-e', '--error-rate', type=float, default=0.0,
+                        help='Share of requests answered with a 500 error')
+    parser.add_argument('-k', '--api-key', default=None)
+    parser.add_argument('-b', '--batch', action='store_true',
+                        help='Fetch all pins of a device in one request')
+    parser.add_argument('-s', '--shards', type=int, default=None,
+                        help='Poll from this many processes')
+    parser.add_argument('--server-processes', type=int, default=1,
+                        help='Processes serving the mock server with --shards')
+    args = parser.parse_args()
+
+    if args.shards:
+        result = _run_sharded(args)
+    else:
+        result = asyncio.run(_run(args))
+    print(f"{'polls':>12}: {result.polls}")
+    print(f"{'requests':>12}: {result.requests}")
+    print(f"{'failures':>12}: {result.failures}")
+    print(f"{'duration':>12}: {result.duration:.2f} s")
+    print(f"{'throughput':>12}: {result.throughput:.1f} polls/s")
+    print(f"{'p50':>12}: {result.p50 * 1000:.1f} ms")
+    print(f"{'p99':>12}: {result.p99 * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""Instrumentation hooks and an in-process metrics registry for Plaato"""
+import bisect
+import math
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .const import DEFAULT_LATENCY_BUCKETS
+from .models.device import PlaatoDeviceType
+from .models.pins import PinsBase
+
+
+class PlaatoHooks(object):
+    """Called by Plaato as requests are made, override the events of
+    interest. Nothing is measured when no hooks are set.
+    """
+
+    def on_request(self, pin: Optional[PinsBase], status: Optional[int],
+                   size: int, seconds: float):
+        """A request finished
+
+        :param pin: Pin requested, None for a batched request
+        :param status: HTTP status, None if the request timed out or the
+            connection failed
+        :param size: Bytes in the response body
+        :param seconds: Time taken by the request
+        """
+
+    def on_decode_error(self, pin: Optional[PinsBase], error: Exception):
+        """A response body could not be decoded"""
+
+    def on_poll(self, device_type: PlaatoDeviceType, seconds: float,
+                missing: List[PinsBase]):
+        """All pins of a device were fetched
+
+        :param seconds: Time taken by the whole poll
+        :param missing: Pins that came back as None
+        """
+
+
+class Counter(object):
+    """Monotonically increasing value per set of labels"""
+
+    def __init__(self, name: str, documentation: str,
+                 labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.__values = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.__values[labels] = self.__values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self.__values.get(labels, 0)
+
+    def samples(self) -> Iterable[Tuple[str, tuple, float]]:
+        for labels, value in self.__values.items():
+            yield self.name + "_total", labels, value
+
+
+class Histogram(object):
+    """Counts of observed values per bucket and set of labels"""
+
+    def __init__(self, name: str, documentation: str,
+                 labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """
+        :param buckets: Upper bounds of the buckets, +Inf is added
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self.__values = {}
+
+    def observe(self, value: float, *labels: str):
+        entry = self.__values.get(labels, None)
+        if entry is None:
+            entry = self.__values[labels] = \
+                [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def count(self, *labels: str) -> int:
+        entry = self.__values.get(labels, None)
+        return 0 if entry is None else entry[2]
+
+    def sum(self, *labels: str) -> float:
+        entry = self.__values.get(labels, None)
+        return 0.0 if entry is None else entry[1]
+
+    def quantile(self, q: float, *labels: str) -> float:
+        """Estimated from the buckets like Prometheus histogram_quantile"""
+        entry = self.__values.get(labels, None)
+        if entry is None or not entry[2]:
+            return math.nan
+        rank = q * entry[2]
+        cumulative = 0
+        for index, count in enumerate(entry[0]):
+            if cumulative + count >= rank and count:
+                if index == len(self.buckets):
+                    return self.buckets[-1] if self.buckets else math.nan
+                low = self.buckets[index - 1] if index else 0.0
+                high = self.buckets[index]
+                return low + (high - low) * (rank - cumulative) / count
+            cumulative += count
+        return math.nan
+
+    def samples(self) -> Iterable[Tuple[str, tuple, float]]:
+        for labels, (counts, total, count) in self.__values.items():
+            cumulative = 0
+            bounds = [_format_value(bound) for bound in self.buckets]
+            for bound, bucket in zip(bounds + ["+Inf"], counts):
+                cumulative += bucket
+                yield self.name + "_bucket", labels + (bound,), cumulative
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, count
+
+
+class MetricsRegistry(object):
+    """Holds metrics and renders them in the Prometheus text format"""
+
+    def __init__(self):
+        self.__metrics = {}
+
+    def counter(self, name: str, documentation: str,
+                labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str,
+                  labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+                  ) -> Histogram:
+        return self._register(
+            Histogram(name, documentation, labels, buckets))
+
+    def get(self, name: str):
+        return self.__metrics.get(name, None)
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self.__metrics.values():
+            kind = "counter" if isinstance(metric, Counter) else "histogram"
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+            for name, labels, value in metric.samples():
+                names = metric.labels
+                if name.endswith("_bucket"):
+                    names = names + ("le",)
+                lines.append(
+                    f"{name}{_format_labels(names, labels)} "
+                    f"{_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        if metric.name in self.__metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.__metrics[metric.name] = metric
+        return metric
+
+
+class MetricsHooks(PlaatoHooks):
+    """Records the events of Plaato into a MetricsRegistry"""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None,
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """
+        :param registry: Registry to add the metrics to, a new one is
+            created if not set
+        :param buckets: Upper bounds of the latency buckets in seconds
+        """
+        self.registry = registry if registry is not None \
+            else MetricsRegistry()
+        self.request_seconds = self.registry.histogram(
+            "plaato_request_seconds", "Time taken by a request",
+            ("pin",), buckets)
+        self.responses = self.registry.counter(
+            "plaato_responses", "Responses by status, none for timeouts",
+            ("pin", "status"))
+        self.response_bytes = self.registry.counter(
+            "plaato_response_bytes", "Bytes received", ("pin",))
+        self.decode_errors = self.registry.counter(
+            "plaato_decode_errors", "Response bodies that failed to decode",
+            ("pin",))
+        self.poll_seconds = self.registry.histogram(
+            "plaato_poll_seconds", "Time taken to fetch all pins",
+            ("device_type",), buckets)
+        self.missing_pins = self.registry.counter(
+            "plaato_missing_pins", "Pins that came back as None",
+            ("device_type", "pin"))
+
+    def on_request(self, pin: Optional[PinsBase], status: Optional[int],
+                   size: int, seconds: float):
+        name = _pin_label(pin)
+        self.request_seconds.observe(seconds, name)
+        self.responses.inc(name, "none" if status is None else str(status))
+        if size:
+            self.response_bytes.inc(name, amount=size)
+
+    def on_decode_error(self, pin: Optional[PinsBase], error: Exception):
+        self.decode_errors.inc(_pin_label(pin))
+
+    def on_poll(self, device_type: PlaatoDeviceType, seconds: float,
+                missing: List[PinsBase]):
+        self.poll_seconds.observe(seconds, device_type.value)
+        for pin in missing:
+            self.missing_pins.inc(device_type.value, pin.name)
+
+
+def _pin_label(pin: Optional[PinsBase]) -> str:
+    return "batch" if pin is None else pin.value
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n") \
+        .replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
@@ -0,0 +1,223 @@
+"""Local server emulating the blynk API used by Plaato devices"""
+import asyncio
+import multiprocessing
+import random
+import socket
+from typing import Callable, Dict, Optional, Union
+
+from aiohttp import web
+
+from .models.airlock import PlaatoAirlock
+from .models.keg import PlaatoKeg
+
+
+def _uniform(low: float, high: float, digits: int) -> Callable:
+    return lambda auth_token: str(round(random.uniform(low, high), digits))
+
+
+def _choice(*values: str) -> Callable:
+    return lambda auth_token: random.choice(values)
+
+
+# Generators of pin values keyed by pin, each called with the auth token
+DEFAULT_GENERATORS = {
+    PlaatoKeg.Pins.BEER_NAME: lambda auth_token: f"Beer {auth_token}",
+    PlaatoKeg.Pins.PERCENT_BEER_LEFT: _uniform(0, 100, 1),
+    PlaatoKeg.Pins.POURING: _choice("0", "0", "0", "255"),
+    PlaatoKeg.Pins.BEER_LEFT: _uniform(0, 19, 2),
+    PlaatoKeg.Pins.BEER_LEFT_UNIT: _choice("L"),
+    PlaatoKeg.Pins.TEMPERATURE: _uniform(2, 8, 1),
+    PlaatoKeg.Pins.UNIT_TYPE: _choice("1"),
+    PlaatoKeg.Pins.MEASURE_UNIT: _choice("1"),
+    PlaatoKeg.Pins.MASS_UNIT: _choice("kg"),
+    PlaatoKeg.Pins.VOLUME_UNIT: _choice("L"),
+    PlaatoKeg.Pins.LAST_POUR: _uniform(0.2, 0.6, 2),
+    PlaatoKeg.Pins.DATE: _choice("10/1/2022"),
+    PlaatoKeg.Pins.OG: _choice("1.050"),
+    PlaatoKeg.Pins.FG: _choice("1.010"),
+    PlaatoKeg.Pins.ABV: _choice("5.25"),
+    PlaatoKeg.Pins.FIRMWARE_VERSION: _choice("2.0.10"),
+    PlaatoKeg.Pins.LEAK_DETECTION: _choice("0"),
+    PlaatoKeg.Pins.MODE: _choice("1"),
+    PlaatoAirlock.Pins.BPM: _uniform(0, 60, 0),
+    PlaatoAirlock.Pins.TEMPERATURE: _uniform(16, 22, 1),
+    PlaatoAirlock.Pins.BATCH_VOLUME: _choice("20"),
+    PlaatoAirlock.Pins.OG: _choice("1.050"),
+    PlaatoAirlock.Pins.SG: _uniform(1.010, 1.050, 3),
+    PlaatoAirlock.Pins.ABV: _uniform(0, 5.25, 2),
+    PlaatoAirlock.Pins.TEMPERATURE_UNIT: _choice("°C"),
+    PlaatoAirlock.Pins.VOLUME_UNIT: _choice("L"),
+    PlaatoAirlock.Pins.BUBBLES: _uniform(0, 50000, 0),
+    PlaatoAirlock.Pins.CO2_VOLUME: _uniform(0, 20, 2),
+}
+
+
+class MockBlynkServer(object):
+    """Serves GET /{auth_token}/get/{pin} for every Keg and Airlock pin
+
+    Batched requests, GET /{auth_token}/get?v48&v49, are answered with an
+    object keyed by pin. Unknown pins are answered like blynk does, with
+    {"error": ...}.
+    """
+
+    def __init__(
+            self, latency: Union[float, Callable[[], float]] = 0.0,
+            error_rate=0.0, generators: Optional[Dict] = None,
+            api_key: Optional[str] = None
+    ):
+        """
+        :param latency: Seconds to wait before answering, or a function
+            returning them
+        :param error_rate: Share of requests answered with a 500 error
+        :param generators: Functions creating the value of each pin,
+            merged into DEFAULT_GENERATORS
+        :param api_key: Require this x-api-key header when set
+        """
+        self.__latency = latency
+        self.__error_rate = error_rate
+        self.__generators = dict(DEFAULT_GENERATORS)
+        self.__generators.update(generators or {})
+        self.__values = {pin.value: generator
+                         for pin, generator in self.__generators.items()}
+        self.__api_key = api_key
+        self.__runner = None
+        self.url = None
+        self.requests = 0
+        self.errors = 0
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/{auth_token}/get", self._handle_batch)
+        app.router.add_get("/{auth_token}/get/{pin}", self._handle_pin)
+        return app
+
+    async def start(self, host="127.0.0.1", port=0, reuse_port=False):
+        """Starts serving, url is set to the address for Plaato
+
+        :param reuse_port: Let several processes serve the same port
+        """
+        self.__runner = web.AppRunner(self.create_app())
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, host, port, reuse_port=reuse_port)
+        await site.start()
+        host, port = self.__runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}/{{auth_token}}/get"
+
+    async def stop(self):
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    async def _handle_pin(self, request: web.Request) -> web.Response:
+        error = await self._prepare(request)
+        if error is not None:
+            return error
+        generator = self.__values.get(request.match_info["pin"], None)
+        if generator is None:
+            return web.json_response(
+                {"error": "Requested pin doesn't exist in the app."})
+        return web.json_response([generator(request.match_info["auth_token"])])
+
+    async def _handle_batch(self, request: web.Request) -> web.Response:
+        error = await self._prepare(request)
+        if error is not None:
+            return error
+        auth_token = request.match_info["auth_token"]
+        return web.json_response({
+            pin: [self.__values[pin](auth_token)]
+            for pin in request.query.keys() if pin in self.__values
+        })
+
+    async def _prepare(self, request: web.Request) -> Optional[web.Response]:
+        self.requests += 1
+        latency = self.__latency() if callable(self.__latency) \
+            else self.__latency
+        if latency:
+            await asyncio.sleep(latency)
+        if self.__api_key is not None \
+                and request.headers.get("x-api-key", None) != self.__api_key:
+            return web.json_response({"error": "Invalid api key"}, status=401)
+        if self.__error_rate and random.random() < self.__error_rate:
+            self.errors += 1
+            return web.json_response({"error": "Server error"}, status=500)
+        return None
+
+
+def _serve(port: int, kwargs: dict, started, stopped):
+    async def serve():
+        server = MockBlynkServer(**kwargs)
+        await server.start(port=port, reuse_port=True)
+        started.put(None)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, stopped.wait)
+        await server.stop()
+        started.put(server.requests)
+
+    asyncio.run(serve())
+
+
+class MockServerPool(object):
+    """Runs MockBlynkServer in several processes sharing one port
+
+    Keeps the server from being the bottleneck when the client is spread
+    over several processes too. Pin generators are not passed on, the
+    processes serve DEFAULT_GENERATORS.
+    """
+
+    def __init__(self, processes: int, latency=0.0, error_rate=0.0,
+                 api_key: Optional[str] = None, start_method="spawn"):
+        """
+        :param processes: Number of server processes
+        """
+        self.__processes = processes
+        self.__kwargs = {"latency": latency, "error_rate": error_rate,
+                         "api_key": api_key}
+        self.__context = multiprocessing.get_context(start_method)
+        self.__started = None
+        self.__stopped = None
+        self.__workers = []
+        self.url = None
+        self.requests = 0
+
+    def start(self, host="127.0.0.1"):
+        """Starts the processes and waits until all of them serve"""
+        with socket.socket() as sock:
+            sock.bind((host, 0))
+            port = sock.getsockname()[1]
+        self.__started = self.__context.Queue()
+        self.__stopped = self.__context.Event()
+        self.__workers = [
+            self.__context.Process(
+                target=_serve, daemon=True,
+                args=(port, self.__kwargs, self.__started, self.__stopped))
+            for _ in range(self.__processes)
+        ]
+        for worker in self.__workers:
+            worker.start()
+        for _ in self.__workers:
+            self.__started.get()
+        self.url = f"http://{host}:{port}/{{auth_token}}/get"
+
+    def stop(self):
+        """Stops the processes, requests is set to the requests they served"""
+        if not self.__workers:
+            return
+        self.__stopped.set()
+        self.requests = sum(self.__started.get() for _ in self.__workers)
+        for worker in self.__workers:
+            worker.join()
+        self.__workers = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
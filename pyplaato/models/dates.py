@@ -0,0 +1,31 @@
+"""Date parsing for the Keg DATE pin"""
+import re
+from datetime import datetime
+from functools import lru_cache
+
+# Formats sent by the Keg, e.g. "10/1/2022" (month first) and "2022-10-01"
+_US_DATE = re.compile(r"\s*(\d{1,2})/(\d{1,2})/(\d{4})\s*$")
+_ISO_DATE = re.compile(r"\s*(\d{4})-(\d{1,2})-(\d{1,2})\s*$")
+
+
+@lru_cache(maxsize=256)
+def parse_date(value: str) -> datetime:
+    """Parses a date without dateutil when the format is a known one
+
+    Gives the same result as dateutil.parser.parse, which is used for any
+    other format.
+    """
+    try:
+        match = _US_DATE.match(value)
+        if match:
+            month, day, year = match.groups()
+            return datetime(int(year), int(month), int(day))
+        match = _ISO_DATE.match(value)
+        if match:
+            year, month, day = match.groups()
+            return datetime(int(year), int(month), int(day))
+    except ValueError:
+        pass
+    # Imported here as it is slow to import and rarely needed
+    import dateutil.parser
+    return dateutil.parser.parse(value)
@@ -1,8 +1,9 @@
-from abc import abstractmethod, ABC
+from abc import abstractmethod
 from datetime import datetime
 from enum import Enum
 
 from .pins import PinsBase
+from .schema import DeviceMeta
 
 
 class PlaatoDeviceType(str, Enum):
@@ -10,7 +11,19 @@ class PlaatoDeviceType(str, Enum):
     Keg = "Keg"
 
 
-class PlaatoDevice(ABC):
+class PlaatoDevice(metaclass=DeviceMeta):
+    """Base of the devices, each declares its pins in _SCHEMA"""
+
+    __slots__ = ("_errors",)
+
+    # Tables generated from the _SCHEMA of each device
+    _SENSOR_NAMES = {}
+    _UNITS = {}
+    _UNIT_ATTRS = {}
+
+    def __init__(self):
+        self._errors = None
+
     @property
     @abstractmethod
     def device_type(self) -> PlaatoDeviceType:
@@ -21,6 +34,26 @@ class PlaatoDevice(ABC):
     def name(self) -> str:
         pass
 
+    @property
+    def parse_errors(self) -> dict:
+        """Pins whose raw value could not be parsed, mapped to the reason"""
+        return dict(self._errors or {})
+
+    def _parse_float(self, pin: PinsBase, value, digits: int):
+        """Parses and rounds a raw value, failures are recorded per pin"""
+        if value is None or isinstance(value, str) and not value.strip():
+            return None
+        try:
+            return round(float(value), digits)
+        except (TypeError, ValueError) as e:
+            self._add_error(pin, e)
+            return None
+
+    def _add_error(self, pin: PinsBase, error: Exception):
+        if self._errors is None:
+            self._errors = {}
+        self._errors[pin] = str(error)
+
     @property
     def date(self) -> float:
         return datetime.now().timestamp()
@@ -45,15 +78,16 @@ class PlaatoDevice(ABC):
         """Convenience method for Home Assistant"""
         return {}
 
-    @abstractmethod
     def get_sensor_name(self, pin: PinsBase) -> str:
         """Convenience method for Home Assistant"""
-        pass
+        return self._SENSOR_NAMES.get(pin, pin.name)
 
-    @abstractmethod
     def get_unit_of_measurement(self, pin: PinsBase):
         """Convenience method to get unit of measurement for Home Assistant"""
-        pass
+        attr = self._UNIT_ATTRS.get(pin, None)
+        if attr is not None:
+            return getattr(self, attr)
+        return self._UNITS.get(pin, "")
 
     @staticmethod
     @abstractmethod
@@ -1,38 +1,37 @@
 from datetime import datetime
 from enum import Enum
+from typing import Optional
 
-import dateutil.parser
-
+from .dates import parse_date
 from .device import PlaatoDevice, PlaatoDeviceType
 from .pins import PinsBase
+from .schema import PinField, PinRole
 from ..const import UNIT_TEMP_CELSIUS, UNIT_TEMP_FAHRENHEIT, UNIT_PERCENTAGE, \
-    METRIC, UNIT_OZ, UNIT_LITRE
+    METRIC, UNIT_OZ, UNIT_LITRE, ATTR_BEER_NAME, ATTR_PERCENT_BEER_LEFT, \
+    ATTR_POURING, ATTR_BEER_LEFT, ATTR_BEER_LEFT_UNIT, ATTR_TEMP, \
+    ATTR_UNIT_TYPE, ATTR_MEASURE_UNIT, ATTR_MASS_UNIT, ATTR_VOLUME_UNIT, \
+    ATTR_LAST_POUR, ATTR_DATE, ATTR_OG, ATTR_FG, ATTR_ABV, \
+    ATTR_FIRMWARE_VERSION, ATTR_LEAK_DETECTION, ATTR_MODE
+
+
+def _format_date(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime('%x')
 
 
 class PlaatoKeg(PlaatoDevice):
-    """Class for holding a Plaato Keg"""
+    """Class for holding a Plaato Keg
+
+    Accessors, sensors, binary_sensors, attributes and from_web_hook are
+    generated from _SCHEMA
+    """
 
     device_type = PlaatoDeviceType.Keg
 
+    __slots__ = ("__timestamp",)
+
     def __init__(self, attrs):
-        self.beer_left_unit = attrs.get(self.Pins.BEER_LEFT_UNIT, None)
-        self.volume_unit = attrs.get(self.Pins.VOLUME_UNIT, None)
-        self.mass_unit = attrs.get(self.Pins.MASS_UNIT, None)
-        self.measure_unit = attrs.get(self.Pins.MEASURE_UNIT, None)
-        self.og = attrs.get(self.Pins.OG, None)
-        self.fg = attrs.get(self.Pins.FG, None)
-        self.__mode = attrs.get(self.Pins.MODE, None)
-        self.__firmware_version = attrs.get(self.Pins.FIRMWARE_VERSION, None)
-        self.__leak_detection = attrs.get(self.Pins.LEAK_DETECTION, None)
-        self.__abv = attrs.get(self.Pins.ABV, None)
-        self.__name = attrs.get(self.Pins.BEER_NAME, "Beer")
-        self.__percent_beer_left = attrs.get(self.Pins.PERCENT_BEER_LEFT, None)
-        self.__pouring = attrs.get(self.Pins.POURING, False)
-        self.__beer_left = attrs.get(self.Pins.BEER_LEFT, None)
-        self.__temperature = attrs.get(self.Pins.TEMPERATURE, None)
-        self.__unit_type = attrs.get(self.Pins.UNIT_TYPE, None)
-        self.__last_pour = attrs.get(self.Pins.LAST_POUR, None)
-        self.__date = attrs.get(self.Pins.DATE, None)
+        self._set_pins(attrs)
+        self.__timestamp = None
 
     def __repr__(self):
         return f"{self.__class__.__name__} -> " \
@@ -42,138 +41,40 @@ class PlaatoKeg(PlaatoDevice):
 
     @property
     def date(self) -> float:
-        if self.__date is not None and self.__date and not self.__date.isspace():
-            date = dateutil.parser.parse(self.__date)
-            return date.timestamp()
+        """Parsed on first access and remembered"""
+        value = self._date
+        if self.__timestamp is None and value is not None:
+            # Webhooks may send the date as a number
+            value = str(value)
+        if self.__timestamp is None and value and not value.isspace():
+            try:
+                self.__timestamp = parse_date(value).timestamp()
+            except (AttributeError, TypeError, ValueError,
+                    OverflowError) as e:
+                self._add_error(self.Pins.DATE, e)
+                self._date = None
+        if self.__timestamp is not None:
+            return self.__timestamp
         return super().date
 
     @property
-    def temperature(self):
-        if self.__temperature is not None:
-            return round(float(self.__temperature), 1)
+    def keg_date(self) -> Optional[float]:
+        """Timestamp of the DATE pin, None if it is missing or invalid"""
+        date = self.date
+        return date if self.__timestamp is not None else None
 
     @property
     def temperature_unit(self):
-        if self.__unit_type == METRIC:
+        if self.unit_type == METRIC:
             return UNIT_TEMP_CELSIUS
         return UNIT_TEMP_FAHRENHEIT
 
-    @property
-    def beer_left(self):
-        if self.__beer_left is not None:
-            return round(float(self.__beer_left), 2)
-
-    @property
-    def percent_beer_left(self):
-        if self.__percent_beer_left is not None:
-            return round(self.__percent_beer_left, 2)
-
-    @property
-    def last_pour(self):
-        if self.__last_pour is not None:
-            return round(float(self.__last_pour), 2)
-
     @property
     def last_pour_unit(self):
-        if self.__unit_type == METRIC:
+        if self.unit_type == METRIC:
             return UNIT_LITRE
         return UNIT_OZ
 
-    @property
-    def abv(self):
-        if self.__abv is not None and not self.__abv:
-            return round(float(self.__abv), 2)
-
-    @property
-    def pouring(self):
-        """
-        0 = Not Pouring
-        255 = Pouring
-        :return: True if 255 = Pouring else False
-        """
-        return self.__pouring == "255"
-
-    @property
-    def leak_detection(self):
-        """
-        1 = Leaking
-        0 = Not Leaking
-        :return: True if 1 = Leaking else False
-        """
-        return self.__leak_detection == "1"
-
-    @property
-    def mode(self):
-        """
-        1 = Beer
-        2 = Co2
-        """
-        return "Beer" if self.__mode == "1" else "Co2"
-
-    @property
-    def name(self) -> str:
-        return self.__name
-
-    @property
-    def firmware_version(self) -> str:
-        return self.__firmware_version
-
-    def get_sensor_name(self, pin: PinsBase) -> str:
-        names = {
-            self.Pins.PERCENT_BEER_LEFT: "Percent Beer Left",
-            self.Pins.POURING: "Pouring",
-            self.Pins.BEER_LEFT: "Beer Left",
-            self.Pins.TEMPERATURE: "Temperature",
-            self.Pins.LAST_POUR: "Last Pour Amount",
-            self.Pins.OG: "Original Gravity",
-            self.Pins.FG: "Final Gravity",
-            self.Pins.ABV: "Alcohol by Volume",
-            self.Pins.LEAK_DETECTION: "Leaking",
-            self.Pins.MODE: "Mode",
-            self.Pins.DATE: "Keg Date",
-            self.Pins.BEER_NAME: "Beer Name"
-        }
-        return names.get(pin, pin.name)
-
-    @property
-    def sensors(self) -> dict:
-        return {
-            self.Pins.PERCENT_BEER_LEFT: self.percent_beer_left,
-            self.Pins.BEER_LEFT: self.beer_left,
-            self.Pins.TEMPERATURE: self.temperature,
-            self.Pins.LAST_POUR: self.last_pour
-        }
-
-    @property
-    def binary_sensors(self) -> dict:
-        return {
-            self.Pins.LEAK_DETECTION: self.leak_detection,
-            self.Pins.POURING: self.pouring,
-        }
-
-    @property
-    def attributes(self) -> dict:
-        return {
-            self.get_sensor_name(self.Pins.BEER_NAME): self.name,
-            self.get_sensor_name(self.Pins.DATE): datetime.fromtimestamp(self.date).strftime('%x'),
-            self.get_sensor_name(self.Pins.MODE): self.mode,
-            self.get_sensor_name(self.Pins.OG): self.og,
-            self.get_sensor_name(self.Pins.FG): self.fg,
-            self.get_sensor_name(self.Pins.ABV): self.abv
-        }
-
-    def get_unit_of_measurement(self, pin: PinsBase):
-        if pin == self.Pins.BEER_LEFT:
-            return self.beer_left_unit
-        if pin == self.Pins.TEMPERATURE:
-            return self.temperature_unit
-        if pin == self.Pins.LAST_POUR:
-            return self.last_pour_unit
-        if pin == self.Pins.ABV or pin == self.Pins.PERCENT_BEER_LEFT:
-            return UNIT_PERCENTAGE
-
-        return ""
-
     # noinspection PyTypeChecker
     @staticmethod
     def pins():
@@ -198,3 +99,50 @@ class PlaatoKeg(PlaatoDevice):
         FIRMWARE_VERSION = "v93"
         LEAK_DETECTION = "v83"
         MODE = "v88"
+
+    _SCHEMA = (
+        PinField(Pins.BEER_NAME, "name", "Beer Name", PinRole.Attribute,
+                 default="Beer", webhook=ATTR_BEER_NAME),
+        PinField(Pins.DATE, "date", "Keg Date", PinRole.Attribute,
+                 webhook=ATTR_DATE, display=_format_date),
+        # 1 = Beer, 2 = Co2
+        PinField(Pins.MODE, "mode", "Mode", PinRole.Attribute,
+                 parse=lambda value: "Beer" if str(value) == "1" else "Co2",
+                 webhook=ATTR_MODE),
+        PinField(Pins.OG, "og", "Original Gravity", PinRole.Attribute,
+                 webhook=ATTR_OG),
+        PinField(Pins.FG, "fg", "Final Gravity", PinRole.Attribute,
+                 webhook=ATTR_FG),
+        PinField(Pins.ABV, "abv", "Alcohol by Volume", PinRole.Attribute,
+                 digits=2, unit=UNIT_PERCENTAGE, webhook=ATTR_ABV),
+        PinField(Pins.PERCENT_BEER_LEFT, "percent_beer_left",
+                 "Percent Beer Left", PinRole.Sensor, digits=2,
+                 unit=UNIT_PERCENTAGE, webhook=ATTR_PERCENT_BEER_LEFT),
+        PinField(Pins.BEER_LEFT, "beer_left", "Beer Left", PinRole.Sensor,
+                 digits=2, unit_attr="beer_left_unit",
+                 webhook=ATTR_BEER_LEFT),
+        PinField(Pins.TEMPERATURE, "temperature", "Temperature",
+                 PinRole.Sensor, digits=1, unit_attr="temperature_unit",
+                 webhook=ATTR_TEMP),
+        PinField(Pins.LAST_POUR, "last_pour", "Last Pour Amount",
+                 PinRole.Sensor, digits=2, unit_attr="last_pour_unit",
+                 webhook=ATTR_LAST_POUR),
+        # 1 = Leaking, 0 = Not Leaking
+        PinField(Pins.LEAK_DETECTION, "leak_detection", "Leaking",
+                 PinRole.BinarySensor,
+                 parse=lambda value: str(value) == "1",
+                 webhook=ATTR_LEAK_DETECTION),
+        # 255 = Pouring, 0 = Not Pouring
+        PinField(Pins.POURING, "pouring", "Pouring", PinRole.BinarySensor,
+                 parse=lambda value: str(value) == "255", default=False,
+                 webhook=ATTR_POURING),
+        PinField(Pins.BEER_LEFT_UNIT, "beer_left_unit",
+                 webhook=ATTR_BEER_LEFT_UNIT),
+        PinField(Pins.UNIT_TYPE, "unit_type", webhook=ATTR_UNIT_TYPE),
+        PinField(Pins.MEASURE_UNIT, "measure_unit",
+                 webhook=ATTR_MEASURE_UNIT),
+        PinField(Pins.MASS_UNIT, "mass_unit", webhook=ATTR_MASS_UNIT),
+        PinField(Pins.VOLUME_UNIT, "volume_unit", webhook=ATTR_VOLUME_UNIT),
+        PinField(Pins.FIRMWARE_VERSION, "firmware_version",
+                 webhook=ATTR_FIRMWARE_VERSION),
+    )
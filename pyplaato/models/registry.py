@@ -0,0 +1,9 @@
+"""Model class for each type of device"""
+from .airlock import PlaatoAirlock
+from .device import PlaatoDeviceType
+from .keg import PlaatoKeg
+
+MODELS = {
+    PlaatoDeviceType.Keg: PlaatoKeg,
+    PlaatoDeviceType.Airlock: PlaatoAirlock,
+}
@@ -0,0 +1,171 @@
+"""Declarative description of the pins of a Plaato device
+
+A device lists one PinField per pin in _SCHEMA. When the class is created
+the schema is compiled into slots, __init__, an accessor per pin, the
+sensors, binary_sensors and attributes properties, from_web_hook and the
+name and unit tables. A new device type only has to declare its pins.
+"""
+from abc import ABCMeta
+from enum import Enum
+from operator import attrgetter
+from typing import Callable, Optional, Sequence
+
+from .pins import PinsBase
+
+
+class PinRole(str, Enum):
+    """Where a pin is reported for Home Assistant"""
+    Sensor = "sensor"
+    BinarySensor = "binary_sensor"
+    Attribute = "attribute"
+
+
+class PinField(object):
+    """How the raw value of a pin is decoded and reported"""
+
+    __slots__ = ("pin", "attr", "label", "role", "parse", "digits",
+                 "keep_raw", "unit", "unit_attr", "default", "webhook",
+                 "display")
+
+    def __init__(
+            self, pin: PinsBase, attr: str, label: Optional[str] = None,
+            role: Optional[PinRole] = None,
+            parse: Optional[Callable] = None, digits: Optional[int] = None,
+            keep_raw=False, unit: Optional[str] = None,
+            unit_attr: Optional[str] = None, default=None,
+            webhook: Optional[str] = None,
+            display: Optional[Callable] = None
+    ):
+        """
+        :param attr: Attribute holding the value. A raw value is stored in
+            a plain attribute of that name, a decoded one behind a read only
+            property. If the class defines attr itself the value is stored
+            in _attr for it to use.
+        :param label: Name shown for the pin
+        :param role: Reported in sensors, binary_sensors or attributes
+        :param parse: Decodes the raw value
+        :param digits: Parse the raw value as a float rounded to digits,
+            failures are recorded in parse_errors
+        :param keep_raw: Keep the raw value when it is not a float
+        :param unit: Unit of measurement
+        :param unit_attr: Attribute holding the unit when it depends on
+            other pins
+        :param default: Value used when the pin is missing
+        :param webhook: Key of the pin in a webhook payload
+        :param display: Formats the value shown in attributes
+        """
+        self.pin = pin
+        self.attr = attr
+        self.label = label
+        self.role = role
+        self.parse = parse
+        self.digits = digits
+        self.keep_raw = keep_raw
+        self.unit = unit
+        self.unit_attr = unit_attr
+        self.default = default
+        self.webhook = webhook
+        self.display = display
+
+
+class DeviceMeta(ABCMeta):
+    """Compiles the _SCHEMA of a device class when the class is created"""
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        schema = namespace.get("_SCHEMA", None)
+        if schema is not None:
+            compile_schema(namespace, schema)
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+def compile_schema(namespace: dict, schema: Sequence[PinField]):
+    """Adds the members generated from a schema to a class namespace"""
+    scope = {}
+    slots = list(namespace.get("__slots__", ()))
+    # A hand written __init__ calls _set_pins to set the pins
+    init_name = "_set_pins" if "__init__" in namespace else "__init__"
+    init = [f"def {init_name}(self, attrs):",
+            "    self._errors = None",
+            "    get = attrs.get"]
+    for index, field in enumerate(schema):
+        scope[f"pin{index}"] = field.pin
+        raw = f"get(pin{index}, default{index})"
+        scope[f"default{index}"] = field.default
+        decoded = field.digits is not None or field.parse is not None
+        slot = field.attr
+        if decoded or field.attr in namespace:
+            slot = "_" + field.attr
+        if field.attr not in namespace and decoded:
+            namespace[field.attr] = property(attrgetter(slot))
+        slots.append(slot)
+
+        if field.digits is not None and field.keep_raw:
+            init.append(f"    raw = {raw}")
+            init.append(f"    value = self._parse_float("
+                        f"pin{index}, raw, {field.digits})")
+            init.append(f"    self.{slot} = raw if value is None else value")
+        elif field.digits is not None:
+            init.append(f"    self.{slot} = self._parse_float("
+                        f"pin{index}, {raw}, {field.digits})")
+        elif field.parse is not None:
+            scope[f"parse{index}"] = field.parse
+            init.append(f"    self.{slot} = parse{index}({raw})")
+        else:
+            init.append(f"    self.{slot} = {raw}")
+    namespace["__slots__"] = tuple(slots)
+    namespace[init_name] = _compile(namespace, init_name, init, scope)
+
+    for role, attr in ((PinRole.Sensor, "sensors"),
+                       (PinRole.BinarySensor, "binary_sensors")):
+        if attr not in namespace:
+            items = ", ".join(
+                f"pin{index}: self.{field.attr}"
+                for index, field in enumerate(schema) if field.role == role)
+            lines = [f"def {attr}(self):", f"    return {{{items}}}"]
+            namespace[attr] = property(
+                _compile(namespace, attr, lines, scope))
+
+    if "attributes" not in namespace:
+        items = []
+        for index, field in enumerate(schema):
+            if field.role != PinRole.Attribute:
+                continue
+            scope[f"label{index}"] = field.label or field.pin.name
+            value = f"self.{field.attr}"
+            if field.display is not None:
+                scope[f"display{index}"] = field.display
+                value = f"display{index}({value})"
+            items.append(f"label{index}: {value}")
+        lines = ["def attributes(self):",
+                 f"    return {{{', '.join(items)}}}"]
+        namespace["attributes"] = property(
+            _compile(namespace, "attributes", lines, scope))
+
+    if "from_web_hook" not in namespace \
+            and any(field.webhook for field in schema):
+        items = []
+        for index, field in enumerate(schema):
+            if field.webhook:
+                scope[f"key{index}"] = field.webhook
+                items.append(f"pin{index}: get(key{index}, default{index})")
+        lines = ["def from_web_hook(cls, data):",
+                 "    get = data.get",
+                 f"    return cls({{{', '.join(items)}}})"]
+        namespace["from_web_hook"] = classmethod(
+            _compile(namespace, "from_web_hook", lines, scope))
+
+    namespace.setdefault("_SENSOR_NAMES", {
+        field.pin: field.label for field in schema if field.label})
+    namespace.setdefault("_UNITS", {
+        field.pin: field.unit for field in schema if field.unit})
+    namespace.setdefault("_UNIT_ATTRS", {
+        field.pin: field.unit_attr for field in schema if field.unit_attr})
+
+
+def _compile(namespace: dict, name: str, lines: list,
+             scope: dict) -> Callable:
+    local = {}
+    exec("\n".join(lines), dict(scope), local)
+    function = local[name]
+    function.__qualname__ = f"{namespace['__qualname__']}.{name}"
+    return function
@@ -1,31 +1,113 @@
 """Fetch data from Plaato Airlock and Keg"""
-from json import JSONDecodeError
-from typing import Optional
-
-from aiohttp import ClientSession
+import asyncio
+import math
+import time
+from enum import Enum
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Optional
 
 import logging
 
+from .cache import PinCache
+from .decode import decode_pin_value, default_loads
+from .metrics import PlaatoHooks
 from .models.airlock import PlaatoAirlock
 from .models.device import PlaatoDevice, PlaatoDeviceType
 from .models.keg import PlaatoKeg
 from .models.pins import PinsBase
-from .const import *
+from .retry import CircuitBreaker, RetryPolicy, TransientStatusError, \
+    parse_retry_after
+from .session import create_session
+from .const import DEFAULT_CONCURRENCY, DEFAULT_STREAM_BUFFER_SIZE, \
+    DEFAULT_STREAM_INTERVAL, DEFAULT_TIMEOUT, URL
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+
+class StreamPolicy(str, Enum):
+    """What Plaato.stream does with snapshots the consumer has not taken"""
+    Drop = "drop"
+    Buffer = "buffer"
 
 
 class Plaato(object):
-    """Represents a Plaato device"""
+    """Represents a Plaato device
 
-    def __init__(self, auth_token="NO_AUTH_TOKEN", url=URL, headers=None):
+    A session can be passed to each call or once to the constructor. Without
+    either, a pooled session is created on first use and closed by close()
+    or when leaving the async context manager.
+    """
+
+    def __init__(self, auth_token="NO_AUTH_TOKEN", url=URL, headers=None,
+                 concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                 limiter: Optional[asyncio.Semaphore] = None, batch=False,
+                 cache: Optional[PinCache] = None,
+                 session: Optional["ClientSession"] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 json_loads: Optional[Callable] = None,
+                 hooks: Optional[PlaatoHooks] = None):
+        """
+        :param concurrency: Max number of pins fetched at the same time
+        :param timeout: Seconds to wait for a single request before giving up
+        :param limiter: Semaphore shared between several instances, used
+            instead of concurrency to cap the requests in flight
+        :param batch: Fetch all pins of a device in a single request, falls
+            back to one request per pin if the server does not support it
+        :param cache: Cache for pins that rarely change, can be shared
+            between several instances
+        :param session: Session used when none is passed to a call, can be
+            shared between several instances
+        :param retry: Policy for retrying failed requests, a failed request
+            is not retried if not set
+        :param breaker: Circuit breaker for the device, stops requests to it
+            after repeated failures
+        :param json_loads: Function decoding a response body, defaults to
+            orjson.loads if installed and json.loads otherwise
+        :param hooks: Called with the latency, size and status of every
+            request and the outcome of every poll
+        """
         if headers is None:
             headers = {}
         self.__headers = headers
+        self.__concurrency = concurrency
+        self.__timeout = timeout
+        self.__limiter = limiter
+        self.__batch = batch
+        self.__cache = cache
+        self.__session = session
+        self.__owns_session = False
+        self.__retry = retry
+        self.__breaker = breaker
+        self.__loads = json_loads or default_loads()
+        self.__hooks = hooks
         if not url:
             url = URL
         self.__url = url.replace('{auth_token}', auth_token)
 
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """Closes the session if it was created by this instance"""
+        if self.__owns_session:
+            await self.__session.close()
+            self.__session = None
+            self.__owns_session = False
+
+    def _get_session(self, session: Optional["ClientSession"]) -> "ClientSession":
+        if session is not None:
+            return session
+        if self.__session is None:
+            self.__session = create_session()
+            self.__owns_session = True
+        return self.__session
+
     async def get_data(
-            self, session: ClientSession,
+            self, session: Optional["ClientSession"],
             device_type: PlaatoDeviceType
     ) -> PlaatoDevice:
         if device_type == PlaatoDeviceType.Keg:
@@ -35,54 +117,304 @@ class Plaato(object):
 
         pass
 
-    async def get_keg_data(self, session: ClientSession) -> PlaatoKeg:
+    async def stream(
+            self, session: Optional["ClientSession"],
+            device_type: PlaatoDeviceType, interval=DEFAULT_STREAM_INTERVAL,
+            policy=StreamPolicy.Drop, buffer_size=DEFAULT_STREAM_BUFFER_SIZE
+    ) -> AsyncIterator[PlaatoDevice]:
+        """Yields a snapshot of the device every interval seconds
+
+        Polls are scheduled on a fixed grid from the first one, so the time
+        taken by a poll does not add up, and run in the background while the
+        consumer handles the previous snapshot. A poll that is still running
+        when the next one is due makes the ones it overlapped be skipped.
+
+        :param interval: Seconds between the start of two polls
+        :param policy: Drop keeps only the latest snapshot when the consumer
+            falls behind, Buffer keeps up to buffer_size snapshots and stops
+            polling while the buffer is full
+        :param buffer_size: Max number of snapshots kept with Buffer
+        """
+        size = 1 if policy == StreamPolicy.Drop else buffer_size
+        queue = asyncio.Queue(maxsize=size)
+        closed = asyncio.Event()
+        producer = asyncio.ensure_future(self._produce(
+            session, device_type, interval, policy, queue, closed))
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            closed.set()
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+    async def _produce(
+            self, session: Optional["ClientSession"],
+            device_type: PlaatoDeviceType, interval: float,
+            policy: StreamPolicy, queue: asyncio.Queue, closed: asyncio.Event
+    ):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        tick = 0
+        while True:
+            try:
+                device = await self.get_data(session, device_type)
+            except Exception as e:
+                logging.getLogger(__name__) \
+                    .warning(f"Failed to poll {device_type} - {e}")
+                device = None
+            # wait_for can swallow the cancellation when a request ends
+            if closed.is_set():
+                return
+
+            if device is not None:
+                if policy == StreamPolicy.Drop and queue.full():
+                    queue.get_nowait()
+                await queue.put(device)
+
+            # Skip the polls that were due while this one was running
+            elapsed = loop.time() - start
+            tick = max(tick + 1, math.ceil(elapsed / interval))
+            await asyncio.sleep(start + tick * interval - loop.time())
+
+    async def get_keg_data(
+            self, session: Optional["ClientSession"] = None
+    ) -> PlaatoKeg:
         """Fetch values for each pin"""
-        result = {}
-        for pin in PlaatoKeg.pins():
-            result[pin] = await self.fetch_data(session, pin)
+        return await self._get_device(session, PlaatoKeg)
+
+    async def get_airlock_data(
+            self, session: Optional["ClientSession"] = None
+    ) -> PlaatoAirlock:
+        """Fetch values for each pin"""
+        return await self._get_device(session, PlaatoAirlock)
+
+    async def _get_device(self, session: Optional["ClientSession"], model):
+        hooks = self.__hooks
+        if hooks is not None:
+            start = time.perf_counter()
+        result = await self.fetch_pins(session, model.pins())
 
         errors = Plaato._get_errors_as_string(result)
         if errors:
             logging.getLogger(__name__) \
                 .warning(f"Failed to get value for {errors}")
 
-        return PlaatoKeg(result)
+        device = model(result)
+        if hooks is not None:
+            hooks.on_poll(
+                device.device_type, time.perf_counter() - start,
+                [pin for pin, value in result.items() if value is None])
+        return device
+
+    async def fetch_pins(
+            self, session: Optional["ClientSession"], pins: list
+    ) -> dict:
+        """Fetches the data for several pins concurrently
+
+        A pin that fails or times out is returned as None
+        """
+        session = self._get_session(session)
+        if self.__cache is None:
+            return await self._fetch_pins(session, pins)
 
-    async def get_airlock_data(self, session: ClientSession) -> PlaatoAirlock:
-        """Fetch values for each pin"""
         result = {}
-        for pin in PlaatoAirlock.pins():
-            result[pin] = await self.fetch_data(session, pin)
+        for pin in pins:
+            result[pin] = self.__cache.get(self.__url, pin)
 
-        errors = Plaato._get_errors_as_string(result)
-        if errors:
+        missing = [pin for pin, value in result.items() if value is None]
+        if missing:
+            fetched = await self._fetch_pins(session, missing)
+            for pin, value in fetched.items():
+                self.__cache.set(self.__url, pin, value)
+            result.update(fetched)
+        return result
+
+    async def _fetch_pins(self, session: "ClientSession", pins: list) -> dict:
+        if self.__breaker is not None and self.__breaker.is_open:
+            return dict.fromkeys(pins)
+
+        semaphore = self._get_semaphore()
+        if self.__batch:
+            async with semaphore:
+                result = await self.fetch_batch(session, pins)
+            if result is not None:
+                return result
+
+        values = await asyncio.gather(
+            *(self._fetch_data(session, pin, semaphore) for pin in pins))
+        return dict(zip(pins, values))
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self.__limiter is not None:
+            return self.__limiter
+        return asyncio.Semaphore(self.__concurrency)
+
+    def _is_available(self) -> bool:
+        return self.__breaker is None or self.__breaker.allow_request()
+
+    def _record_result(self, success: bool):
+        if self.__breaker is None:
+            return
+        if success:
+            self.__breaker.record_success()
+        else:
+            self.__breaker.record_failure()
+
+    async def fetch_batch(
+            self, session: Optional["ClientSession"], pins: list
+    ) -> Optional[dict]:
+        """Fetches the data for several pins in a single request
+
+        The server is expected to answer with an object keyed by pin, e.g.
+        {"v102": "12", "v103": ["20.5"]}. Batching is turned off for this
+        instance if the server does not support it.
+
+        :return: None if the pins have to be fetched one by one. Every pin is
+            None if the device is unavailable or rate limited.
+        """
+        from aiohttp import ClientError
+
+        if not self._is_available():
+            return dict.fromkeys(pins)
+        session = self._get_session(session)
+        url = f"{self.__url}?{'&'.join(pin.value for pin in pins)}"
+        start = time.perf_counter() if self.__hooks is not None else 0
+        try:
+            status, data = await asyncio.wait_for(
+                self._get_json(session, url, start), self.__timeout)
+        except (asyncio.TimeoutError, ClientError) as e:
             logging.getLogger(__name__) \
-                .warning(f"Failed to get value for {errors}")
+                .debug(f"Batch request failed, fetching pins one by one - {e}")
+            if self.__hooks is not None:
+                self.__hooks.on_request(
+                    None, None, 0, time.perf_counter() - start)
+            self._record_result(False)
+            return None
+
+        if status == 429:
+            # Fetching the pins one by one would only make it worse
+            logging.getLogger(__name__) \
+                .debug("Batch request rate limited")
+            self._record_result(False)
+            return dict.fromkeys(pins)
+        self._record_result(status < 500)
+        if status >= 500:
+            return None
+        if status >= 400 or not isinstance(data, dict) \
+                or not any(pin.value in data for pin in pins):
+            logging.getLogger(__name__) \
+                .debug("Batch requests not supported, turning them off")
+            self.__batch = False
+            return None
 
-        return PlaatoAirlock(result)
+        result = {}
+        for pin in pins:
+            result[pin] = decode_pin_value(data.get(pin.value, None))
+        return result
+
+    async def _get_json(self, session: "ClientSession", url: str,
+                        start: float):
+        hooks = self.__hooks
+        async with session.get(url=url, headers=self.__headers) as resp:
+            if resp.status >= 400:
+                if hooks is not None:
+                    hooks.on_request(None, resp.status, 0,
+                                     time.perf_counter() - start)
+                return resp.status, None
+            body = await resp.read()
+            if hooks is not None:
+                hooks.on_request(None, resp.status, len(body),
+                                 time.perf_counter() - start)
+            try:
+                return resp.status, self.__loads(body)
+            except ValueError as e:
+                if hooks is not None:
+                    hooks.on_decode_error(None, e)
+                return resp.status, None
 
-    async def fetch_data(self, session: ClientSession, pin: PinsBase):
-        """Fetches the data for a specific pin"""
+    async def fetch_data(
+            self, session: Optional["ClientSession"], pin: PinsBase
+    ):
+        """Fetches the data for a specific pin
+
+        Failed requests are retried as set by the retry policy, a pin that
+        still fails is returned as None
+        """
+        return await self._fetch_data(
+            self._get_session(session), pin, self._get_semaphore())
+
+    async def _fetch_data(
+            self, session: "ClientSession", pin: PinsBase,
+            semaphore: asyncio.Semaphore
+    ):
+        from aiohttp import ClientError
+
+        attempts = 1 if self.__retry is None else self.__retry.attempts
+        hooks = self.__hooks
+        error = None
+        for attempt in range(attempts):
+            retry_after = None
+            try:
+                async with semaphore:
+                    # The breaker may have opened while waiting
+                    if not self._is_available():
+                        logging.getLogger(__name__).debug(
+                            f"Device unavailable, skipping pin {pin.name}")
+                        return None
+                    start = time.perf_counter() if hooks is not None else 0
+                    result = await asyncio.wait_for(
+                        self._request_pin(session, pin, start),
+                        self.__timeout)
+                self._record_result(True)
+                return result
+            except TransientStatusError as e:
+                error, retry_after = e, e.retry_after
+            except asyncio.TimeoutError:
+                error = "Timed out"
+                if hooks is not None:
+                    hooks.on_request(pin, None, 0, time.perf_counter() - start)
+            except ValueError as e:
+                error = f"Failed to decode json - {e}"
+                if hooks is not None:
+                    hooks.on_decode_error(pin, e)
+            except ClientError as e:
+                error = e
+                if hooks is not None:
+                    hooks.on_request(pin, None, 0, time.perf_counter() - start)
+
+            self._record_result(False)
+            if attempt + 1 < attempts:
+                await asyncio.sleep(self.__retry.delay(attempt, retry_after))
+
+        logging.getLogger(__name__) \
+            .debug(f"Failed to fetch pin {pin.name} - {error}")
+        return None
+
+    async def _request_pin(self, session: "ClientSession", pin: PinsBase,
+                           start: float):
         async with session.get(
                 url=f"{self.__url}/{pin.value}",
                 headers=self.__headers
         ) as resp:
-            result = None
-            try:
-                data = await resp.json(content_type=None)
-                if Plaato._iterable(data):
-                    if "error" in data:
-                        logging.getLogger(__name__) \
-                            .debug(f"Pin {pin.name} not found")
-                    elif len(data) == 1:
-                        result = data[0]
-                else:
-                    result = data
-
-            except JSONDecodeError as e:
-                logging.getLogger(__name__)\
-                    .warning(f"Failed to decode json for pin {pin} - {e.msg}")
-            return result
+            if resp.status == 429 or resp.status >= 500:
+                if self.__hooks is not None:
+                    self.__hooks.on_request(
+                        pin, resp.status, 0, time.perf_counter() - start)
+                raise TransientStatusError(
+                    resp.status,
+                    parse_retry_after(resp.headers.get("Retry-After", None))
+                )
+
+            body = await resp.read()
+            if self.__hooks is not None:
+                self.__hooks.on_request(
+                    pin, resp.status, len(body), time.perf_counter() - start)
+            data = self.__loads(body)
+            if type(data) is dict:
+                logging.getLogger(__name__) \
+                    .debug(f"Pin {pin.name} not found")
+            return decode_pin_value(data)
 
     @staticmethod
     def _get_errors_as_string(result: dict) -> Optional[str]:
@@ -91,11 +423,12 @@ class Plaato(object):
             return ', '.join(map(lambda elem: elem.name, errors.keys()))
         return None
 
-    @staticmethod
-    def _iterable(obj):
-        try:
-            iter(obj)
-        except TypeError:
-            return False
-        else:
-            return True
+
+def __getattr__(name):
+    """Constants used to be star imported here, keep them importable"""
+    from . import const
+    try:
+        return getattr(const, name)
+    except AttributeError:
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}") from None
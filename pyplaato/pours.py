@@ -0,0 +1,138 @@
+"""Pour events and consumption of a Plaato Keg"""
+import time
+from typing import Optional
+
+from .const import DEFAULT_REFILL_PERCENT
+from .models.keg import PlaatoKeg
+
+
+class PourEvent(object):
+    """A single pour from a keg"""
+
+    __slots__ = ("start", "end", "volume")
+
+    def __init__(self, start: Optional[float], end: float,
+                 volume: Optional[float]):
+        """
+        :param start: When pouring started, None if the pour happened
+            between two snapshots and was only seen through LAST_POUR
+        :param end: When pouring was seen to have stopped
+        :param volume: Amount poured, in the unit of the keg
+        """
+        self.start = start
+        self.end = end
+        self.volume = volume
+
+    def __repr__(self):
+        return f"{self.__class__.__name__} -> " \
+               f"Volume: {self.volume}, " \
+               f"Duration: {self.duration}"
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.start is None:
+            return None
+        return self.end - self.start
+
+
+class PourDetector(object):
+    """Finds pours and tracks consumption from a stream of keg snapshots
+
+    Every snapshot is handled in constant time. Consumption is averaged
+    from the last time the keg was filled up.
+    """
+
+    def __init__(self, refill_percent=DEFAULT_REFILL_PERCENT):
+        """
+        :param refill_percent: Rise in percent beer left that counts as
+            the keg being filled up
+        """
+        self.__refill_percent = refill_percent
+        self.__pouring = False
+        self.__pour_start = None
+        self.__beer_left_at_start = None
+        self.__last_pour = None
+        self.__pending = None
+        self.__anchor = None
+        self.__latest = None
+        self.pours = 0
+        self.volume = 0.0
+
+    def update(self, keg: PlaatoKeg,
+               timestamp: Optional[float] = None) -> Optional[PourEvent]:
+        """Handles the next snapshot
+
+        :param timestamp: When the snapshot was taken, defaults to now
+        :return: The pour that just finished, if any. Its volume is
+            estimated from beer left until LAST_POUR reports it, which
+            then updates the returned event.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self._track_consumption(keg.percent_beer_left, timestamp)
+
+        event = None
+        last_pour = keg.last_pour
+        last_pour_changed = self.__last_pour is not None \
+            and last_pour is not None and last_pour != self.__last_pour
+        if keg.pouring and not self.__pouring:
+            self.__pour_start = timestamp
+            self.__beer_left_at_start = keg.beer_left
+            self.__pending = None
+        elif not keg.pouring and self.__pouring:
+            event = PourEvent(self.__pour_start, timestamp, None)
+            if last_pour_changed:
+                event.volume = last_pour
+            else:
+                # LAST_POUR is often updated a snapshot later
+                event.volume = self._beer_left_used(keg.beer_left)
+                self.__pending = event
+        elif not keg.pouring and last_pour_changed:
+            if self.__pending is not None:
+                self.volume += last_pour - (self.__pending.volume or 0)
+                self.__pending.volume = last_pour
+                self.__pending = None
+            else:
+                # Poured between two snapshots
+                event = PourEvent(None, timestamp, last_pour)
+
+        self.__pouring = keg.pouring
+        if not keg.pouring:
+            self.__last_pour = last_pour
+        if event is not None:
+            self.pours += 1
+            if event.volume is not None:
+                self.volume += event.volume
+        return event
+
+    @property
+    def percent_per_hour(self) -> Optional[float]:
+        """Average consumption since the keg was last filled up"""
+        if self.__anchor is None or self.__latest is None:
+            return None
+        start_time, start_percent = self.__anchor
+        end_time, end_percent = self.__latest
+        if end_time <= start_time:
+            return None
+        return (start_percent - end_percent) / (end_time - start_time) * 3600
+
+    @property
+    def seconds_until_empty(self) -> Optional[float]:
+        """Projected from the average consumption, None if nothing is used"""
+        rate = self.percent_per_hour
+        if not rate or rate <= 0:
+            return None
+        return self.__latest[1] / rate * 3600
+
+    def _track_consumption(self, percent: Optional[float], timestamp: float):
+        if percent is None:
+            return
+        if self.__anchor is None or self.__latest is None \
+                or percent - self.__latest[1] >= self.__refill_percent:
+            self.__anchor = (timestamp, percent)
+        self.__latest = (timestamp, percent)
+
+    def _beer_left_used(self, beer_left: Optional[float]) -> Optional[float]:
+        if beer_left is None or self.__beer_left_at_start is None:
+            return None
+        return round(self.__beer_left_at_start - beer_left, 2)
@@ -0,0 +1,111 @@
+"""Retry and circuit breaker policies for requests to a Plaato device"""
+import random
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from .const import DEFAULT_FAILURE_THRESHOLD, DEFAULT_RESET_TIMEOUT, \
+    DEFAULT_RETRY_ATTEMPTS, DEFAULT_RETRY_BASE_DELAY, DEFAULT_RETRY_MAX_DELAY
+
+
+class TransientStatusError(Exception):
+    """Raised for a response status that is worth retrying, e.g. 429 or 5xx"""
+
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class RetryPolicy(object):
+    """Exponential backoff with full jitter between attempts"""
+
+    def __init__(self, attempts=DEFAULT_RETRY_ATTEMPTS,
+                 base_delay=DEFAULT_RETRY_BASE_DELAY,
+                 max_delay=DEFAULT_RETRY_MAX_DELAY, jitter=True):
+        """
+        :param attempts: Max number of attempts, including the first one
+        :param base_delay: Seconds to wait after the first failed attempt
+        :param max_delay: Max seconds to wait between attempts, also caps
+            the delay asked for by a Retry-After header
+        :param jitter: Wait a random time between zero and the delay
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait after the given zero based attempt failed"""
+        if retry_after is not None:
+            return min(max(retry_after, 0), self.max_delay)
+        delay = min(self.base_delay * 2 ** attempt, self.max_delay)
+        if self.jitter:
+            return random.uniform(0, delay)
+        return delay
+
+
+class CircuitBreaker(object):
+    """Stops requests to a device after repeated failures
+
+    Once open, requests are refused until the cool-down has passed. The
+    next request is then let through as a probe and the others are refused
+    while it runs. A failed probe opens the breaker again, while a success
+    closes it. A probe that never reports back is replaced after another
+    cool-down.
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout=DEFAULT_RESET_TIMEOUT, clock=time.monotonic):
+        """
+        :param failure_threshold: Consecutive failures that open the breaker
+        :param reset_timeout: Seconds to refuse requests once open
+        :param clock: Function returning the current time in seconds
+        """
+        self.__failure_threshold = failure_threshold
+        self.__reset_timeout = reset_timeout
+        self.__clock = clock
+        self.__failures = 0
+        self.__opened_at = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.__opened_at is not None \
+            and self.__clock() - self.__opened_at < self.__reset_timeout
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent, the probe is taken if half open"""
+        if self.__opened_at is None:
+            return True
+        if self.is_open:
+            return False
+        # Half open, refuse the others until the probe reports back
+        self.__opened_at = self.__clock()
+        return True
+
+    def record_success(self):
+        self.__failures = 0
+        self.__opened_at = None
+
+    def record_failure(self):
+        self.__failures += 1
+        if self.__failures >= self.__failure_threshold:
+            self.__opened_at = self.__clock()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, in seconds or as a date"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return (date - datetime.now(timezone.utc)).total_seconds()
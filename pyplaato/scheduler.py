@@ -0,0 +1,211 @@
+"""Poll each pin of a Plaato device as often as it is seen to change"""
+import asyncio
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .const import DEFAULT_CHANGE_SMOOTHING, DEFAULT_METADATA_TTL, \
+    DEFAULT_PIN_MAX_INTERVAL, DEFAULT_PIN_MERGE_WINDOW, \
+    DEFAULT_PIN_MIN_INTERVAL
+from .models.airlock import PlaatoAirlock
+from .models.device import PlaatoDevice, PlaatoDeviceType
+from .models.keg import PlaatoKeg
+from .models.pins import PinsBase
+from .models.registry import MODELS
+from .plaato import Plaato
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+# (min, max) seconds between polls of pins that differ from the defaults.
+# Pours and leaks must be seen quickly even after a long quiet spell.
+DEFAULT_PIN_BOUNDS = {
+    PlaatoKeg.Pins.POURING: (DEFAULT_PIN_MIN_INTERVAL, 30),
+    PlaatoKeg.Pins.LAST_POUR: (DEFAULT_PIN_MIN_INTERVAL, 60),
+    PlaatoKeg.Pins.LEAK_DETECTION: (DEFAULT_PIN_MIN_INTERVAL, 60),
+    PlaatoKeg.Pins.BEER_NAME: (60, DEFAULT_METADATA_TTL),
+    PlaatoKeg.Pins.FIRMWARE_VERSION: (60, DEFAULT_METADATA_TTL),
+    PlaatoKeg.Pins.DATE: (60, DEFAULT_METADATA_TTL),
+    PlaatoAirlock.Pins.BPM: (DEFAULT_PIN_MIN_INTERVAL, 120),
+}
+
+# Pins fetched in the next round whenever the key pin changes
+DEFAULT_WAKE = {
+    PlaatoKeg.Pins.POURING: (
+        PlaatoKeg.Pins.BEER_LEFT,
+        PlaatoKeg.Pins.PERCENT_BEER_LEFT,
+        PlaatoKeg.Pins.LAST_POUR,
+    ),
+}
+
+
+class _PinState(object):
+    __slots__ = ("min", "max", "interval", "due", "value",
+                 "last_change", "change_period")
+
+    def __init__(self, bounds: Tuple[float, float], now: float):
+        self.min, self.max = bounds
+        self.interval = self.min
+        self.due = now
+        self.value = None
+        self.last_change = None
+        self.change_period = None
+
+
+class PinScheduler(object):
+    """Learns how often each pin of a device changes and polls it to match
+
+    The time between changes of a pin is smoothed into a change period and
+    the pin is polled twice per period, within its bounds. A pin that has
+    not changed for a while is polled less and less often. Pins that are
+    due within merge_window of each other are fetched in the same round.
+    """
+
+    def __init__(
+            self, plaato: Plaato, device_type: PlaatoDeviceType,
+            min_interval=DEFAULT_PIN_MIN_INTERVAL,
+            max_interval=DEFAULT_PIN_MAX_INTERVAL,
+            merge_window=DEFAULT_PIN_MERGE_WINDOW,
+            smoothing=DEFAULT_CHANGE_SMOOTHING,
+            bounds: Optional[Dict[PinsBase, Tuple[float, float]]] = None,
+            wake: Optional[Dict[PinsBase, Iterable[PinsBase]]] = None,
+            pins: Optional[Iterable[PinsBase]] = None,
+            clock=time.monotonic
+    ):
+        """
+        :param min_interval: Min seconds between polls of a pin
+        :param max_interval: Max seconds between polls of a pin
+        :param merge_window: Seconds a pin is fetched early to join a round
+        :param smoothing: Weight of the latest time between changes in the
+            change period, between 0 and 1
+        :param bounds: (min, max) seconds per pin, defaults to
+            DEFAULT_PIN_BOUNDS
+        :param wake: Pins to fetch in the next round when a pin changes,
+            defaults to DEFAULT_WAKE
+        :param pins: Pins to poll, all pins of the device if not set
+        """
+        self.__plaato = plaato
+        self.__model = MODELS[device_type]
+        self.__merge_window = merge_window
+        self.__smoothing = smoothing
+        self.__wake = DEFAULT_WAKE if wake is None else wake
+        self.__clock = clock
+        if bounds is None:
+            bounds = DEFAULT_PIN_BOUNDS
+        now = clock()
+        self.__pins = {
+            pin: _PinState(bounds.get(pin, (min_interval, max_interval)), now)
+            for pin in (self.__model.pins() if pins is None else pins)
+        }
+        self.__stopped = None
+        self.rounds = 0
+        self.fetches = 0
+
+    @property
+    def values(self) -> dict:
+        """Last known value of each pin"""
+        return {pin: state.value for pin, state in self.__pins.items()
+                if state.value is not None}
+
+    @property
+    def device(self) -> Optional[PlaatoDevice]:
+        """Model built from the last known values"""
+        values = self.values
+        if not values:
+            return None
+        return self.__model(values)
+
+    def interval(self, pin: PinsBase) -> float:
+        """Current seconds between polls of a pin"""
+        return self.__pins[pin].interval
+
+    def due(self, now: Optional[float] = None) -> List[PinsBase]:
+        """Pins to fetch in a round started now"""
+        if now is None:
+            now = self.__clock()
+        limit = now + self.__merge_window
+        return [pin for pin, state in self.__pins.items()
+                if state.due <= limit]
+
+    @property
+    def next_round(self) -> float:
+        """Seconds until the next pin is due"""
+        due = min(state.due for state in self.__pins.values())
+        return max(due - self.__clock(), 0.0)
+
+    async def poll(
+            self, session: Optional["ClientSession"]
+    ) -> Dict[PinsBase, tuple]:
+        """Fetches the pins that are due in one round
+
+        A pin that could not be fetched keeps its last known value and is
+        retried after its min interval.
+
+        :return: The changed pins mapped to (old_value, new_value)
+        """
+        now = self.__clock()
+        pins = self.due(now)
+        if not pins:
+            return {}
+        result = await self.__plaato.fetch_pins(session, pins)
+        self.rounds += 1
+        self.fetches += len(pins)
+
+        now = self.__clock()
+        changes = {}
+        for pin, value in result.items():
+            state = self.__pins[pin]
+            if value is None:
+                state.due = now + state.min
+                continue
+            if state.value is not None and value != state.value:
+                changes[pin] = (state.value, value)
+                self._learn(state, now)
+            elif state.value is None:
+                changes[pin] = (None, value)
+                state.last_change = now
+            state.value = value
+            state.interval = self._interval(state, now)
+            state.due = now + state.interval
+
+        for pin in changes:
+            for woken in self.__wake.get(pin, ()):
+                if woken in self.__pins:
+                    self.__pins[woken].due = now
+        return changes
+
+    async def run(self, session: Optional["ClientSession"], callback=None):
+        """Polls until stop is called
+
+        :param callback: Called with the changes of every round that has any
+        """
+        self.__stopped = asyncio.Event()
+        while not self.__stopped.is_set():
+            changes = await self.poll(session)
+            if changes and callback is not None:
+                callback(changes)
+            try:
+                await asyncio.wait_for(
+                    self.__stopped.wait(), self.next_round)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        if self.__stopped is not None:
+            self.__stopped.set()
+
+    def _learn(self, state: _PinState, now: float):
+        period = now - state.last_change
+        if state.change_period is None:
+            state.change_period = period
+        else:
+            state.change_period += \
+                self.__smoothing * (period - state.change_period)
+        state.last_change = now
+
+    @staticmethod
+    def _interval(state: _PinState, now: float) -> float:
+        # A pin quiet for longer than it used to change is slowing down
+        period = now - state.last_change
+        if state.change_period is not None:
+            period = max(period, state.change_period)
+        return min(max(period / 2, state.min), state.max)
@@ -0,0 +1,38 @@
+"""Pooled HTTP session shared by Plaato clients"""
+from typing import TYPE_CHECKING
+
+from .const import DEFAULT_DNS_CACHE_TTL, DEFAULT_KEEPALIVE_TIMEOUT, \
+    DEFAULT_LIMIT_PER_HOST, DEFAULT_POOL_LIMIT
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+
+def create_session(
+        limit=DEFAULT_POOL_LIMIT, limit_per_host=DEFAULT_LIMIT_PER_HOST,
+        keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+        dns_cache_ttl=DEFAULT_DNS_CACHE_TTL, **kwargs
+) -> "ClientSession":
+    """Creates a session whose connections are kept alive and reused
+
+    Pass the same session to several Plaato instances to share one
+    connection pool between them. Must be called from a coroutine.
+
+    :param limit: Max number of open connections
+    :param limit_per_host: Max number of open connections per host
+    :param keepalive_timeout: Seconds an idle connection is kept open
+    :param dns_cache_ttl: Seconds a resolved host name is cached
+    :param kwargs: Passed on to ClientSession
+    """
+    # Imported here so that importing pyplaato does not load aiohttp
+    from aiohttp import ClientSession, TCPConnector
+
+    connector = TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        use_dns_cache=True,
+        ttl_dns_cache=dns_cache_ttl,
+        enable_cleanup_closed=True
+    )
+    return ClientSession(connector=connector, **kwargs)
@@ -0,0 +1,234 @@
+"""Poll a very large fleet of Plaato devices from several processes
+
+Decoding responses and building models for thousands of devices keeps a
+single event loop busy on one core. ShardedFleet splits the devices into
+shards, each polled by its own process with its own event loop and session.
+A worker sends back the raw pin values only, the models are built by the
+caller.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .const import DEFAULT_FAILURE_THRESHOLD, DEFAULT_LIMIT_PER_HOST, \
+    DEFAULT_MAX_IN_FLIGHT, DEFAULT_RESET_TIMEOUT, DEFAULT_TIMEOUT, URL
+from .models.device import PlaatoDevice, PlaatoDeviceType
+from .models.registry import MODELS
+from .plaato import Plaato
+from .retry import CircuitBreaker, RetryPolicy
+from .session import create_session
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+# Values of the pins of a device, in the order of its model's pins()
+PinValues = Tuple[Optional[str], ...]
+
+
+def split(devices: list, shards: int) -> List[list]:
+    """Deals the devices round robin into at most shards non empty lists"""
+    return [devices[index::shards]
+            for index in range(min(shards, len(devices)))]
+
+
+class _ShardWorker(object):
+    """Polls the devices of one shard, lives in the worker process"""
+
+    def __init__(self, devices: list, options: dict):
+        self.devices = devices
+        self.url = options["url"]
+        self.headers = options["headers"]
+        self.max_in_flight = options["max_in_flight"]
+        self.limit_per_host = options["limit_per_host"]
+        self.timeout = options["timeout"]
+        self.batch = options["batch"]
+        self.retry = options["retry"]
+        self.breakers = {
+            auth_token: CircuitBreaker(options["failure_threshold"],
+                                       options["reset_timeout"])
+            for auth_token, _ in devices
+        }
+        self.loop = asyncio.new_event_loop()
+        self.session: Optional["ClientSession"] = None
+
+    def poll(self) -> List[Tuple[str, Optional[PinValues]]]:
+        return self.loop.run_until_complete(self._poll())
+
+    def close(self):
+        if self.session is not None:
+            self.loop.run_until_complete(self.session.close())
+            self.session = None
+        self.loop.close()
+
+    async def _poll(self) -> List[Tuple[str, Optional[PinValues]]]:
+        if self.session is None:
+            self.session = create_session(
+                limit=self.max_in_flight, limit_per_host=self.limit_per_host)
+        limiter = asyncio.Semaphore(self.max_in_flight)
+        return await asyncio.gather(*(
+            self._poll_device(limiter, auth_token, device_type)
+            for auth_token, device_type in self.devices
+        ))
+
+    async def _poll_device(
+            self, limiter: asyncio.Semaphore, auth_token: str,
+            device_type: PlaatoDeviceType
+    ) -> Tuple[str, Optional[PinValues]]:
+        plaato = Plaato(
+            auth_token, self.url, self.headers, timeout=self.timeout,
+            limiter=limiter, batch=self.batch, retry=self.retry,
+            breaker=self.breakers[auth_token]
+        )
+        pins = MODELS[device_type].pins()
+        try:
+            result = await plaato.fetch_pins(self.session, pins)
+        except Exception as e:
+            logging.getLogger(__name__) \
+                .warning(f"Failed to poll {device_type} - {e}")
+            return auth_token, None
+        return auth_token, tuple(result[pin] for pin in pins)
+
+
+_worker: Optional[_ShardWorker] = None
+
+
+def _start_worker(devices: list, options: dict):
+    global _worker
+    _worker = _ShardWorker(devices, options)
+
+
+def _poll_shard() -> List[Tuple[str, Optional[PinValues]]]:
+    return _worker.poll()
+
+
+def _stop_worker():
+    global _worker
+    if _worker is not None:
+        _worker.close()
+        _worker = None
+
+
+class ShardedFleet(object):
+    """Represents a fleet of Plaato devices polled from several processes
+
+    Each shard is always polled by the same process, which keeps its
+    session and the circuit breakers of its devices between polls.
+    """
+
+    def __init__(
+            self, devices: Iterable[Tuple[str, PlaatoDeviceType]],
+            shards: Optional[int] = None, url=URL, headers=None,
+            max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+            limit_per_host=DEFAULT_LIMIT_PER_HOST,
+            timeout=DEFAULT_TIMEOUT, batch=False,
+            retry: Optional[RetryPolicy] = None,
+            failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+            reset_timeout=DEFAULT_RESET_TIMEOUT, start_method="spawn"
+    ):
+        """
+        :param devices: Pairs of auth token and device type to poll
+        :param shards: Number of worker processes, defaults to the number
+            of CPUs
+        :param max_in_flight: Max number of requests in flight per shard
+        :param limit_per_host: Max number of connections per host per shard
+        :param timeout: Seconds to wait for a single request before giving up
+        :param batch: Fetch all pins of a device in a single request
+        :param retry: Policy for retrying failed requests
+        :param failure_threshold: Consecutive failures after which a device
+            is skipped until reset_timeout seconds have passed
+        :param start_method: How the worker processes are started, see
+            multiprocessing.get_context
+        """
+        self.__devices = list(devices)
+        self.__types = dict(self.__devices)
+        self.__pins = {device_type: model.pins()
+                       for device_type, model in MODELS.items()}
+        self.__shards = split(self.__devices, shards or os.cpu_count() or 1)
+        self.__options = {
+            "url": url,
+            "headers": headers,
+            "max_in_flight": max_in_flight,
+            "limit_per_host": limit_per_host,
+            "timeout": timeout,
+            "batch": batch,
+            "retry": retry,
+            "failure_threshold": failure_threshold,
+            "reset_timeout": reset_timeout,
+        }
+        self.__start_method = start_method
+        self.__executors = None
+
+    @property
+    def devices(self) -> list:
+        return list(self.__devices)
+
+    @property
+    def shards(self) -> List[list]:
+        """Devices polled by each worker process"""
+        return [list(shard) for shard in self.__shards]
+
+    def start(self):
+        """Starts the worker processes, done by the first poll otherwise"""
+        if self.__executors is not None:
+            return
+        context = multiprocessing.get_context(self.__start_method)
+        self.__executors = [
+            ProcessPoolExecutor(
+                max_workers=1, mp_context=context,
+                initializer=_start_worker, initargs=(shard, self.__options))
+            for shard in self.__shards
+        ]
+
+    async def close(self):
+        """Closes the sessions and stops the worker processes"""
+        if self.__executors is None:
+            return
+        executors, self.__executors = self.__executors, None
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(executor, _stop_worker)
+              for executor in executors),
+            return_exceptions=True)
+        for executor in executors:
+            executor.shutdown()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def poll(self) -> Dict[str, Optional[PlaatoDevice]]:
+        """Polls every device and returns the results keyed by auth token
+
+        A device that could not be polled is returned as None
+        """
+        return {auth_token: self.build(auth_token, values)
+                for auth_token, values in (await self.poll_raw()).items()}
+
+    async def poll_raw(self) -> Dict[str, Optional[PinValues]]:
+        """Polls every device and returns the pin values keyed by auth token
+
+        The values of a device are in the order of its model's pins(), a
+        device that could not be polled is returned as None
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        shards = await asyncio.gather(
+            *(loop.run_in_executor(executor, _poll_shard)
+              for executor in self.__executors))
+        return {auth_token: values
+                for shard in shards for auth_token, values in shard}
+
+    def build(self, auth_token: str,
+              values: Optional[PinValues]) -> Optional[PlaatoDevice]:
+        """Builds the model of a device from the values from poll_raw"""
+        if values is None:
+            return None
+        device_type = self.__types[auth_token]
+        return MODELS[device_type](
+            dict(zip(self.__pins[device_type], values)))
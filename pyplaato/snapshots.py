@@ -0,0 +1,272 @@
+"""Append-only binary log of pin readings with memory mapped replay
+
+The file starts with a header, followed by records of two kinds:
+
+* device: kind (B), device index (I), device type (B), id length (H), id
+* reading: kind (B), device index (I), pin number (H), timestamp (d),
+  value length (H), value as UTF-8
+
+All numbers are little endian. The pin number is the number of the virtual
+pin, e.g. 102 for "v102". A value length of 0xFFFF means the value is None.
+"""
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterator, Optional
+
+from .const import DEFAULT_SNAPSHOT_BUFFER_SIZE
+from .models.device import PlaatoDevice, PlaatoDeviceType
+from .models.pins import PinsBase
+from .models.registry import MODELS
+
+_MAGIC = b"PLTO\x01\x00"
+_DEVICE = 0
+_READING = 1
+_NONE = 0xFFFF
+
+_DEVICE_HEADER = struct.Struct("<BIBH")
+_READING_HEADER = struct.Struct("<BIHdH")
+
+_DEVICE_TYPES = list(PlaatoDeviceType)
+_PINS = {
+    device_type: {int(pin.value[1:]): pin for pin in model.pins()}
+    for device_type, model in MODELS.items()
+}
+
+
+class Snapshot(object):
+    """Readings of one device taken at the same time
+
+    The model is only built when device is read.
+    """
+
+    __slots__ = ("device_id", "device_type", "timestamp", "values")
+
+    def __init__(self, device_id: str, device_type: PlaatoDeviceType,
+                 timestamp: float, values: Dict[PinsBase, Optional[str]]):
+        self.device_id = device_id
+        self.device_type = device_type
+        self.timestamp = timestamp
+        self.values = values
+
+    @property
+    def device(self) -> PlaatoDevice:
+        return MODELS[self.device_type](self.values)
+
+
+class SnapshotWriter(object):
+    """Appends pin readings to a snapshot log through a buffered file"""
+
+    def __init__(self, path, buffer_size=DEFAULT_SNAPSHOT_BUFFER_SIZE):
+        """
+        :param path: Log file, created if missing and appended to otherwise
+        :param buffer_size: Bytes buffered before they are written to disk
+        """
+        self.__devices = {}
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with SnapshotReader(path) as reader:
+                self.__devices = {
+                    device_id: index
+                    for index, (device_id, _) in reader.devices.items()
+                }
+                end = reader.end
+            # Drop a record cut short by a crash, appending after it would
+            # corrupt the records that follow
+            if end < os.path.getsize(path):
+                os.truncate(path, end)
+        self.__file = open(path, "ab", buffering=buffer_size)
+        if not exists:
+            self.__file.write(_MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, device_id: str, device_type: PlaatoDeviceType,
+              values: Dict[PinsBase, object],
+              timestamp: Optional[float] = None):
+        """Writes raw pin values, such as returned by Plaato.fetch_pins
+
+        :param timestamp: Seconds since the epoch, defaults to now
+        :raises ValueError: If a value is 0xFFFF bytes or longer in UTF-8
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        index = self.__devices.get(device_id, None)
+        if index is None:
+            index = self._write_device(device_id, device_type)
+
+        write = self.__file.write
+        pack = _READING_HEADER.pack
+        for pin, value in values.items():
+            number = int(pin.value[1:])
+            if value is None:
+                write(pack(_READING, index, number, timestamp, _NONE))
+                continue
+            data = str(value).encode("utf-8")
+            if len(data) >= _NONE:
+                raise ValueError(
+                    f"Value of {pin.name} is too long, {len(data)} bytes")
+            write(pack(_READING, index, number, timestamp, len(data)))
+            write(data)
+
+    def flush(self):
+        self.__file.flush()
+
+    def close(self):
+        self.__file.close()
+
+    def _write_device(self, device_id: str,
+                      device_type: PlaatoDeviceType) -> int:
+        index = len(self.__devices)
+        data = device_id.encode("utf-8")
+        self.__file.write(_DEVICE_HEADER.pack(
+            _DEVICE, index, _DEVICE_TYPES.index(device_type), len(data)))
+        self.__file.write(data)
+        self.__devices[device_id] = index
+        return index
+
+
+class SnapshotReader(object):
+    """Replays a snapshot log from a memory mapped file
+
+    Values are only decoded for the readings that are yielded, and models
+    are only built when Snapshot.device is read.
+    """
+
+    def __init__(self, path):
+        """
+        :raises ValueError: If the file is not a snapshot log
+        """
+        self.__file = open(path, "rb")
+        self.__map = b""
+        if os.fstat(self.__file.fileno()).st_size:
+            self.__map = mmap.mmap(
+                self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.__map[:len(_MAGIC)] != _MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a snapshot log")
+        self.__devices = {}
+        self.__scanned = False
+        self.__end = len(_MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if isinstance(self.__map, mmap.mmap):
+            self.__map.close()
+        self.__file.close()
+
+    @property
+    def devices(self) -> Dict[int, tuple]:
+        """(device id, device type) of every device, keyed by index"""
+        if not self.__scanned:
+            for _ in self._scan():
+                pass
+        return dict(self.__devices)
+
+    @property
+    def end(self) -> int:
+        """Offset just past the last complete record"""
+        if not self.__scanned:
+            for _ in self._scan():
+                pass
+        return self.__end
+
+    def readings(
+            self, start: Optional[float] = None, end: Optional[float] = None,
+            device_id: Optional[str] = None
+    ) -> Iterator[tuple]:
+        """Yields (device id, pin, timestamp, value) in the order written
+
+        :param start: Skip readings before this time
+        :param end: Skip readings at or after this time
+        :param device_id: Only yield readings of this device
+        """
+        for index, pin, timestamp, value in \
+                self._readings(start, end, device_id):
+            yield self.__devices[index][0], pin, timestamp, value
+
+    def snapshots(
+            self, start: Optional[float] = None, end: Optional[float] = None,
+            device_id: Optional[str] = None
+    ) -> Iterator[Snapshot]:
+        """Yields the readings grouped per device and timestamp"""
+        snapshot = None
+        last = None
+        for index, pin, timestamp, value in \
+                self._readings(start, end, device_id):
+            if (index, timestamp) != last:
+                if snapshot is not None:
+                    yield snapshot
+                name, device_type = self.__devices[index]
+                snapshot = Snapshot(name, device_type, timestamp, {})
+                last = (index, timestamp)
+            snapshot.values[pin] = value
+        if snapshot is not None:
+            yield snapshot
+
+    def _readings(self, start: Optional[float], end: Optional[float],
+                  device_id: Optional[str]) -> Iterator[tuple]:
+        data = self.__map
+        devices = self.__devices
+        for index, number, timestamp, offset, length in self._scan():
+            if start is not None and timestamp < start \
+                    or end is not None and timestamp >= end:
+                continue
+            name, device_type = devices[index]
+            if device_id is not None and name != device_id:
+                continue
+            value = None
+            if length != _NONE:
+                value = str(data[offset:offset + length], "utf-8")
+            yield index, _PINS[device_type][number], timestamp, value
+
+    def _scan(self) -> Iterator[tuple]:
+        """Yields (device index, pin number, timestamp, offset, length)
+
+        Device records are added to the device table on the way. A record
+        cut short at the end of the file, e.g. by a crash, is ignored.
+        """
+        data = self.__map
+        size = len(data)
+        offset = len(_MAGIC)
+        reading = _READING_HEADER.unpack_from
+        reading_size = _READING_HEADER.size
+        device_size = _DEVICE_HEADER.size
+        while offset < size:
+            if data[offset] == _READING:
+                if offset + reading_size > size:
+                    break
+                _, index, number, timestamp, length = reading(data, offset)
+                offset += reading_size
+                if length != _NONE:
+                    if offset + length > size:
+                        break
+                    self.__end = offset + length
+                    yield index, number, timestamp, offset, length
+                    offset += length
+                else:
+                    self.__end = offset
+                    yield index, number, timestamp, offset, length
+            else:
+                if offset + device_size > size:
+                    break
+                _, index, device_type, length = \
+                    _DEVICE_HEADER.unpack_from(data, offset)
+                offset += device_size
+                if offset + length > size:
+                    break
+                name = str(data[offset:offset + length], "utf-8")
+                self.__devices[index] = (name, _DEVICE_TYPES[device_type])
+                offset += length
+                self.__end = offset
+        self.__scanned = True
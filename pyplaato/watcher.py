@@ -0,0 +1,141 @@
+"""Poll a Plaato device and get called back only when a pin changes"""
+import asyncio
+import inspect
+import logging
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional
+
+from .const import DEFAULT_WATCH_ACTIVE_INTERVAL, DEFAULT_WATCH_IDLE_AFTER, \
+    DEFAULT_WATCH_IDLE_INTERVAL, DEFAULT_WATCH_INTERVAL
+from .models.device import PlaatoDevice, PlaatoDeviceType
+from .models.keg import PlaatoKeg
+from .models.pins import PinsBase
+from .models.registry import MODELS
+from .plaato import Plaato
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+
+class PlaatoWatcher(object):
+    """Remembers the last value of every pin and reports the changes
+
+    Polls faster while a keg is pouring and slower once nothing has
+    changed for a while.
+    """
+
+    def __init__(
+            self, plaato: Plaato, device_type: PlaatoDeviceType,
+            interval=DEFAULT_WATCH_INTERVAL,
+            active_interval=DEFAULT_WATCH_ACTIVE_INTERVAL,
+            idle_interval=DEFAULT_WATCH_IDLE_INTERVAL,
+            idle_after=DEFAULT_WATCH_IDLE_AFTER
+    ):
+        """
+        :param interval: Seconds between polls by default
+        :param active_interval: Seconds between polls while a keg is pouring
+        :param idle_interval: Seconds between polls while nothing changes
+        :param idle_after: Number of polls without changes before the
+            idle interval is used
+        """
+        self.__plaato = plaato
+        self.__model = MODELS[device_type]
+        self.__interval = interval
+        self.__active_interval = active_interval
+        self.__idle_interval = idle_interval
+        self.__idle_after = idle_after
+        self.__values = {}
+        self.__callbacks = []
+        self.__unchanged_polls = 0
+        self.__stopped = None
+
+    @property
+    def values(self) -> dict:
+        """Last known value of each pin"""
+        return dict(self.__values)
+
+    @property
+    def device(self) -> Optional[PlaatoDevice]:
+        """Model built from the last known values"""
+        if not self.__values:
+            return None
+        return self.__model(self.__values)
+
+    @property
+    def next_interval(self) -> float:
+        if self.__values.get(PlaatoKeg.Pins.POURING, None) == "255":
+            return self.__active_interval
+        if self.__unchanged_polls >= self.__idle_after:
+            return self.__idle_interval
+        return self.__interval
+
+    def subscribe(
+            self, callback: Callable,
+            pins: Optional[Iterable[PinsBase]] = None
+    ) -> Callable:
+        """Registers callback(pin, old_value, new_value)
+
+        The callback can be a plain function or a coroutine function.
+        Values seen on the first poll are reported with old_value None.
+
+        :param pins: Only report these pins, all pins if not set
+        :return: Function that removes the subscription
+        """
+        subscription = (callback, None if pins is None else set(pins))
+        self.__callbacks.append(subscription)
+
+        def unsubscribe():
+            if subscription in self.__callbacks:
+                self.__callbacks.remove(subscription)
+
+        return unsubscribe
+
+    async def poll(self, session: "ClientSession") -> Dict[PinsBase, tuple]:
+        """Polls once and calls back for every changed pin
+
+        A pin that could not be fetched keeps its last known value.
+
+        :return: The changed pins mapped to (old_value, new_value)
+        """
+        result = await self.__plaato.fetch_pins(session, self.__model.pins())
+
+        changes = {}
+        for pin, value in result.items():
+            if value is None:
+                continue
+            old_value = self.__values.get(pin, None)
+            if value != old_value:
+                changes[pin] = (old_value, value)
+                self.__values[pin] = value
+
+        self.__unchanged_polls = 0 if changes else self.__unchanged_polls + 1
+
+        for pin, (old_value, value) in changes.items():
+            await self._notify(pin, old_value, value)
+        return changes
+
+    async def run(self, session: "ClientSession"):
+        """Polls until stop is called"""
+        self.__stopped = asyncio.Event()
+        while not self.__stopped.is_set():
+            await self.poll(session)
+            try:
+                await asyncio.wait_for(
+                    self.__stopped.wait(), self.next_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        if self.__stopped is not None:
+            self.__stopped.set()
+
+    async def _notify(self, pin: PinsBase, old_value, value):
+        for callback, pins in list(self.__callbacks):
+            if pins is not None and pin not in pins:
+                continue
+            try:
+                result = callback(pin, old_value, value)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logging.getLogger(__name__) \
+                    .warning(f"Callback failed for pin {pin.name} - {e}")
@@ -0,0 +1,113 @@
+"""Receive webhooks from Plaato Airlock and Keg"""
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from aiohttp import web
+
+from .const import ATTR_DEVICE_ID, DEFAULT_WEBHOOK_PATH, \
+    DEFAULT_WEBHOOK_PUT_TIMEOUT, DEFAULT_WEBHOOK_QUEUE_SIZE
+from .decode import default_loads
+from .models.device import PlaatoDeviceType
+from .models.registry import MODELS
+
+
+class PlaatoWebhookReceiver(object):
+    """Receives webhooks and puts them on a bounded queue
+
+    A request body holds one webhook object or a list of them. Every
+    webhook is queued as a (device_id, model) tuple. When the queue is full
+    the request waits for room, and is answered with 503 if there is still
+    none after put_timeout seconds. Webhooks queued before that stay queued.
+    """
+
+    def __init__(
+            self, device_type=PlaatoDeviceType.Airlock,
+            path=DEFAULT_WEBHOOK_PATH, queue_size=DEFAULT_WEBHOOK_QUEUE_SIZE,
+            put_timeout=DEFAULT_WEBHOOK_PUT_TIMEOUT,
+            json_loads: Optional[Callable] = None
+    ):
+        """
+        :param device_type: Type of device sending to this receiver
+        :param path: Path the webhooks are posted to
+        :param queue_size: Max number of webhooks waiting to be consumed
+        :param put_timeout: Seconds a request waits for room on the queue
+        :param json_loads: Function decoding the request body
+        """
+        self.__model = MODELS[device_type]
+        self.__path = path
+        self.__queue_size = queue_size
+        self.__put_timeout = put_timeout
+        self.__loads = json_loads or default_loads()
+        self.__queue = None
+        self.__runner = None
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self.__queue is None:
+            self.__queue = asyncio.Queue(self.__queue_size)
+        return self.__queue
+
+    def add_routes(self, app: web.Application):
+        """Adds the webhook route to an existing application"""
+        app.router.add_post(self.__path, self.handle)
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        self.add_routes(app)
+        return app
+
+    async def start(self, host: Optional[str] = None, port=8080):
+        """Starts a server for the webhooks"""
+        self.__runner = web.AppRunner(self.create_app())
+        await self.__runner.setup()
+        await web.TCPSite(self.__runner, host, port).start()
+
+    async def stop(self):
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    def parse(self, body: bytes) -> list:
+        """Parses a request body into (device_id, model) tuples
+
+        :raises ValueError: If the body is not a webhook or list of them
+        """
+        data = self.__loads(body)
+        if type(data) is dict:
+            data = [data]
+        if type(data) is not list or \
+                not all(type(item) is dict for item in data):
+            raise ValueError("Expected an object or a list of objects")
+        return [
+            (item.get(ATTR_DEVICE_ID, None), self.__model.from_web_hook(item))
+            for item in data
+        ]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        try:
+            webhooks = self.parse(await request.read())
+        except ValueError as e:
+            logging.getLogger(__name__) \
+                .debug(f"Invalid webhook - {e}")
+            return web.json_response({"error": str(e)}, status=400)
+
+        for accepted, webhook in enumerate(webhooks):
+            try:
+                await asyncio.wait_for(
+                    self.queue.put(webhook), self.__put_timeout)
+            except asyncio.TimeoutError:
+                logging.getLogger(__name__) \
+                    .warning(f"Webhook queue full, dropped "
+                             f"{len(webhooks) - accepted} webhooks")
+                return web.json_response(
+                    {"accepted": accepted}, status=503,
+                    headers={"Retry-After": str(self.__put_timeout)})
+
+        return web.json_response({"accepted": len(webhooks)})
@@ -13,6 +13,10 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/JohNan/pyplaato",
     packages=setuptools.find_packages(exclude=["tests", "tests.*"]),
+    extras_require={
+        "fast": ["orjson"],
+        "analytics": ["numpy"],
+    },
     classifiers=[
         "Framework :: AsyncIO",
         "Programming Language :: Python :: 3",
@@ -0,0 +1,22 @@
+from pyplaato.models.airlock import PlaatoAirlock
+
+pins = PlaatoAirlock.Pins
+
+
+def test_values_are_parsed_once_at_construction():
+    airlock = PlaatoAirlock({
+        pins.SG: "1.01234",
+        pins.CO2_VOLUME: "2.345",
+        pins.TEMPERATURE: "19.87",
+    })
+    assert 1.012 == airlock.sg
+    assert 2.35 == airlock.co2_volume
+    assert 19.9 == airlock.temperature
+    assert {} == airlock.parse_errors
+
+
+def test_junk_values_are_recorded_as_parse_errors():
+    airlock = PlaatoAirlock({pins.ABV: "junk", pins.TEMPERATURE: "N/A"})
+    assert airlock.abv is None
+    assert "N/A" == airlock.temperature
+    assert {pins.ABV, pins.TEMPERATURE} == set(airlock.parse_errors)
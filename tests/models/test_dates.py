@@ -0,0 +1,17 @@
+import dateutil.parser
+import pytest
+
+from pyplaato.models.dates import parse_date
+
+
+@pytest.mark.parametrize("value", [
+    "10/1/2022", "1/10/2022", "01/02/2023", " 10/1/2022 ",
+    "2022-10-01", "2022-1-2", "13/1/2022", "Oct 1 2022", "2022-10-01T12:30:00",
+])
+def test_parse_date_matches_dateutil(value):
+    assert dateutil.parser.parse(value) == parse_date(value)
+
+
+def test_parse_date_raises_for_unknown_value():
+    with pytest.raises(ValueError):
+        parse_date("not a date")
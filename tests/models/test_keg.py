@@ -40,3 +40,64 @@ def test_date_prop_with_space_string(m_datetime):
     pins = PlaatoKeg.Pins
     keg = PlaatoKeg({pins.DATE: " "})
     assert now.timestamp() == keg.date
+
+
+@mock.patch("pyplaato.models.device.datetime")
+def test_date_prop_with_invalid_value_is_recorded_as_parse_error(m_datetime):
+    now = datetime(2022, 10, 1)
+    m_datetime.now.return_value = now
+    pins = PlaatoKeg.Pins
+    keg = PlaatoKeg({pins.DATE: "not a date"})
+    assert now.timestamp() == keg.date
+    assert pins.DATE in keg.parse_errors
+
+
+def test_date_prop_with_number_is_parsed():
+    keg = PlaatoKeg.from_web_hook({"date": 20221001})
+    assert 1664578800.0 == keg.date
+    assert "Keg Date" in keg.attributes
+    assert not keg.parse_errors
+
+
+@mock.patch("pyplaato.models.device.datetime")
+def test_date_prop_with_invalid_number_is_recorded_as_parse_error(m_datetime):
+    now = datetime(2022, 10, 1)
+    m_datetime.now.return_value = now
+    keg = PlaatoKeg.from_web_hook({"date": 99999999999})
+    assert now.timestamp() == keg.date
+    assert PlaatoKeg.Pins.DATE in keg.parse_errors
+
+
+def test_values_are_parsed_once_at_construction():
+    pins = PlaatoKeg.Pins
+    keg = PlaatoKeg({
+        pins.TEMPERATURE: "4.56",
+        pins.PERCENT_BEER_LEFT: "45.678",
+        pins.ABV: "5.123",
+        pins.BEER_LEFT: "junk",
+    })
+    assert 4.6 == keg.temperature
+    assert 45.68 == keg.percent_beer_left
+    assert 5.12 == keg.abv
+    assert keg.beer_left is None
+    assert [pins.BEER_LEFT] == list(keg.parse_errors)
+
+
+def test_from_web_hook():
+    keg = PlaatoKeg.from_web_hook({
+        "beer_name": "IPA", "pouring": "255", "beer_left": "12.345"
+    })
+    assert "IPA" == keg.name
+    assert keg.pouring
+    assert 12.35 == keg.beer_left
+
+
+def test_from_web_hook_with_numbers():
+    keg = PlaatoKeg.from_web_hook({
+        "pouring": 255, "leak_detection": 1, "mode": 1, "beer_left": 12.345
+    })
+    assert keg.pouring
+    assert keg.leak_detection
+    assert "Beer" == keg.mode
+    assert 12.35 == keg.beer_left
+    assert not PlaatoKeg.from_web_hook({"pouring": 0}).pouring
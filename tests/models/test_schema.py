@@ -0,0 +1,66 @@
+from enum import Enum
+
+import pytest
+
+from pyplaato.models.device import PlaatoDevice, PlaatoDeviceType
+from pyplaato.models.keg import PlaatoKeg
+from pyplaato.models.pins import PinsBase
+from pyplaato.models.schema import PinField, PinRole
+
+
+class _Fridge(PlaatoDevice):
+    device_type = PlaatoDeviceType.Keg
+
+    __slots__ = ()
+
+    @property
+    def name(self) -> str:
+        return "Fridge"
+
+    @staticmethod
+    def pins():
+        return list(_Fridge.Pins)
+
+    class Pins(PinsBase, Enum):
+        TEMPERATURE = "v1"
+        DOOR = "v2"
+        MODEL = "v3"
+        UNIT = "v4"
+
+    _SCHEMA = (
+        PinField(Pins.TEMPERATURE, "temperature", "Temperature",
+                 PinRole.Sensor, digits=1, unit_attr="unit", webhook="temp"),
+        PinField(Pins.DOOR, "door_open", "Door", PinRole.BinarySensor,
+                 parse=lambda value: value == "1", webhook="door"),
+        PinField(Pins.MODEL, "model", "Model", PinRole.Attribute,
+                 default="Unknown", display=str.upper),
+        PinField(Pins.UNIT, "unit"),
+    )
+
+
+def test_schema_generates_device_members():
+    pins = _Fridge.Pins
+    fridge = _Fridge({pins.TEMPERATURE: "3.14", pins.DOOR: "1",
+                      pins.UNIT: "°C"})
+    assert 3.1 == fridge.temperature
+    assert {pins.TEMPERATURE: 3.1} == fridge.sensors
+    assert {pins.DOOR: True} == fridge.binary_sensors
+    assert {"Model": "UNKNOWN"} == fridge.attributes
+    assert "Door" == fridge.get_sensor_name(pins.DOOR)
+    assert "°C" == fridge.get_unit_of_measurement(pins.TEMPERATURE)
+    assert "UNIT" == fridge.get_sensor_name(pins.UNIT)
+
+
+def test_schema_generates_from_web_hook_and_records_errors():
+    fridge = _Fridge.from_web_hook({"temp": "warm", "door": "0"})
+    assert fridge.temperature is None
+    assert not fridge.door_open
+    assert [_Fridge.Pins.TEMPERATURE] == list(fridge.parse_errors)
+
+
+def test_decoded_values_are_read_only_and_raw_values_are_plain():
+    keg = PlaatoKeg({PlaatoKeg.Pins.OG: "1.050"})
+    keg.og = "1.060"
+    assert "1.060" == keg.og
+    with pytest.raises(AttributeError):
+        keg.beer_left = 1
@@ -0,0 +1,57 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pyplaato.analytics import FermentationPhase, FermentationReport, \
+    moving_average, phases, seconds_until_below, stack
+from pyplaato.history import DeviceHistory
+from pyplaato.models.airlock import PlaatoAirlock
+from pyplaato.models.device import PlaatoDeviceType
+
+pins = PlaatoAirlock.Pins
+
+
+def _history(bpms, og="1.050", sg="1.010"):
+    history = DeviceHistory(PlaatoDeviceType.Airlock, capacity=100)
+    for minute, bpm in enumerate(bpms):
+        history.append(PlaatoAirlock(
+            {pins.BPM: bpm, pins.OG: og, pins.SG: sg}), minute * 60)
+    return history
+
+
+def test_stack_right_aligns_rows():
+    _, values = stack([_history(["1", "2"]), _history(["3"])], pins.BPM)
+    assert math.isnan(values[1, 0])
+    assert [[1, 2], [3, 3]] == np.nan_to_num(values, nan=3).tolist()
+
+
+def test_moving_average_skips_nan():
+    values = np.array([[1.0, 3.0, np.nan, 5.0]])
+    assert [[1, 2, 3, 5]] == moving_average(values, 2).tolist()
+
+
+def test_phases():
+    bpm = np.array([[0, 20, 20, 5, 0.5]])
+    assert [[FermentationPhase.LAG, FermentationPhase.ACTIVE,
+             FermentationPhase.ACTIVE, FermentationPhase.SLOWING,
+             FermentationPhase.FINISHED]] == phases(bpm, 10, 1).tolist()
+
+
+def test_seconds_until_below_follows_the_trend():
+    timestamps = np.array([[0.0, 60, 120], [0, 60, 120], [0, 60, 120]])
+    values = np.array([[30.0, 20, 10], [5, 5, 5], [1, 0.5, 0.1]])
+    result = seconds_until_below(timestamps, values, 1, window=3)
+    assert [54, math.inf, 0] == pytest.approx(result.tolist())
+
+
+def test_report_covers_every_device():
+    report = FermentationReport(
+        [_history(["0", "30", "20", "10"]), _history([], og="1.050")],
+        window=1, active_bpm=10, idle_bpm=1)
+    assert [FermentationPhase.ACTIVE, FermentationPhase.LAG] \
+        == report.phase.tolist()
+    assert [100 / 1.25] == pytest.approx(report.attenuation[:1].tolist())
+    assert [5.25] == pytest.approx(report.abv[:1].tolist())
+    assert math.isnan(report.abv[1])
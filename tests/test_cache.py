@@ -0,0 +1,41 @@
+from pyplaato.cache import PinCache
+from pyplaato.models.keg import PlaatoKeg
+
+pins = PlaatoKeg.Pins
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_returns_value_until_it_expires():
+    clock = _Clock()
+    cache = PinCache(ttl={pins.BEER_NAME: 10}, clock=clock)
+    cache.set("keg", pins.BEER_NAME, "IPA")
+    clock.now = 9
+    assert "IPA" == cache.get("keg", pins.BEER_NAME)
+    clock.now = 10
+    assert cache.get("keg", pins.BEER_NAME) is None
+    assert (1, 1) == (cache.hits, cache.misses)
+
+
+def test_pins_without_ttl_are_never_cached():
+    cache = PinCache(ttl={pins.BEER_NAME: 10})
+    cache.set("keg", pins.POURING, "255")
+    assert cache.get("keg", pins.POURING) is None
+    assert (0, 0) == (cache.hits, cache.misses)
+
+
+def test_least_recently_used_device_is_evicted():
+    cache = PinCache(max_devices=2, ttl={pins.BEER_NAME: 10})
+    cache.set("keg-1", pins.BEER_NAME, "IPA")
+    cache.set("keg-2", pins.BEER_NAME, "Stout")
+    cache.get("keg-1", pins.BEER_NAME)
+    cache.set("keg-3", pins.BEER_NAME, "Lager")
+    assert 2 == len(cache)
+    assert "IPA" == cache.get("keg-1", pins.BEER_NAME)
+    assert cache.get("keg-2", pins.BEER_NAME) is None
@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+
+import cli
+from pyplaato.mock import MockBlynkServer
+
+
+def _args(**kwargs):
+    defaults = dict(auth_token=None, device=None, inventory=None,
+                    watch=None, output='json', url=None, api_key=None)
+    defaults.update(kwargs)
+    return argparse.Namespace(**defaults)
+
+
+async def _run(args, timeout=None):
+    out = io.StringIO()
+    async with MockBlynkServer(api_key="secret") as server:
+        args.url = server.url
+        args.api_key = "secret"
+        try:
+            await asyncio.wait_for(cli.go(args, out), timeout)
+        except asyncio.TimeoutError:
+            pass
+    return out.getvalue()
+
+
+def test_read_inventory(tmp_path):
+    path = tmp_path / "devices.txt"
+    path.write_text("# token, type, id\n"
+                    "abc, keg, bar-1\n"
+                    "\n"
+                    "def airlock\n")
+    assert [("abc", cli.PlaatoDeviceType.Keg, "bar-1"),
+            ("def", cli.PlaatoDeviceType.Airlock, "def")] == \
+        cli.read_inventory(path)
+
+    path.write_text("abc fridge\n")
+    with pytest.raises(ValueError):
+        cli.read_inventory(path)
+
+
+def test_many_devices_are_written_as_json_lines(tmp_path):
+    path = tmp_path / "devices.txt"
+    path.write_text("a keg keg-a\nb airlock\n")
+    output = asyncio.run(_run(_args(
+        inventory=str(path), auth_token=["c"], device='keg')))
+    records = [json.loads(line) for line in output.splitlines()]
+    assert {"keg-a", "b", "c"} == {record["device_id"] for record in records}
+    keg = next(record for record in records if record["device_id"] == "c")
+    assert "Keg" == keg["device_type"]
+    assert "Beer c" == keg["name"]
+    assert keg["beer_left"] is not None
+    assert "L" == keg["beer_left_unit"]
+    assert 5.25 == keg["alcohol_by_volume"]
+
+
+def test_watch_writes_csv_rows_every_interval():
+    output = asyncio.run(_run(_args(
+        auth_token=["a"], device='airlock', output='csv', watch=0.1), 0.35))
+    rows = list(csv.DictReader(io.StringIO(output)))
+    assert 4 == len(rows)
+    assert {"Airlock"} == {row["device_type"] for row in rows}
+    assert all(row["bpm"] for row in rows)
+
+
+def test_csv_columns_hold_attributes_and_units():
+    output = asyncio.run(_run(_args(auth_token=["a"], device='keg',
+                                    output='csv')))
+    rows = list(csv.DictReader(io.StringIO(output)))
+    assert 1 == len(rows)
+    row = rows[0]
+    assert all(value != '' for value in row.values())
+    assert "Beer a" == row["beer_name"]
+    assert "1.050" == row["original_gravity"]
+    assert "°C" == row["temperature_unit"]
+    assert "2022-10-01" == row["keg_date"]
+
+
+def test_missing_keg_date_is_written_as_null():
+    server = MockBlynkServer(generators={
+        cli.PlaatoKeg.Pins.DATE: lambda auth_token: None})
+
+    async def run():
+        out = io.StringIO()
+        async with server:
+            await cli.go(_args(auth_token=["a"], device='keg',
+                               url=server.url), out)
+        return out.getvalue()
+
+    assert json.loads(asyncio.run(run()))["keg_date"] is None
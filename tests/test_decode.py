@@ -0,0 +1,23 @@
+import json
+
+import pytest
+
+from pyplaato.decode import decode_pin_value, default_loads
+
+
+@pytest.mark.parametrize("body, value", [
+    (b'["23.4"]', "23.4"),
+    (b'[]', None),
+    (b'["1", "2"]', None),
+    (b'{"error": "Requested pin doesn\'t exist in the app."}', None),
+    (b'"23.4"', "23.4"),
+    (b'23.4', 23.4),
+])
+def test_decode_pin_value(body, value):
+    assert value == decode_pin_value(default_loads()(body))
+    assert value == decode_pin_value(json.loads(body))
+
+
+def test_default_loads_raises_value_error_for_invalid_json():
+    with pytest.raises(ValueError):
+        default_loads()(b"<html>")
@@ -0,0 +1,84 @@
+import asyncio
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+
+from pyplaato.fleet import PlaatoFleet
+from pyplaato.models.airlock import PlaatoAirlock
+from pyplaato.models.device import PlaatoDeviceType
+from pyplaato.models.keg import PlaatoKeg
+
+DEVICES = [
+    ("keg-1", PlaatoDeviceType.Keg),
+    ("keg-2", PlaatoDeviceType.Keg),
+    ("airlock-1", PlaatoDeviceType.Airlock),
+]
+
+
+class _Server(object):
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handler(self, request):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return web.json_response(["1"])
+
+
+async def _poll(fleet_kwargs, stream=False):
+    server = _Server()
+    app = web.Application()
+    app.router.add_get("/{auth_token}/get/{pin}", server.handler)
+    async with TestServer(app) as test_server:
+        url = str(test_server.make_url("/")) + "{auth_token}/get"
+        fleet = PlaatoFleet(DEVICES, url, **fleet_kwargs)
+        if stream:
+            async with ClientSession() as session:
+                result = [r async for r in fleet.as_completed(session)]
+        else:
+            async with fleet:
+                result = await fleet.poll()
+    return result, server
+
+
+def test_poll_returns_a_model_per_device():
+    result, _ = asyncio.run(_poll({"jitter": 0}))
+    assert isinstance(result["keg-1"], PlaatoKeg)
+    assert isinstance(result["keg-2"], PlaatoKeg)
+    assert isinstance(result["airlock-1"], PlaatoAirlock)
+
+
+def test_as_completed_yields_every_device():
+    result, _ = asyncio.run(_poll({"jitter": 0.05}, stream=True))
+    assert sorted(token for token, _ in result) == sorted(t for t, _ in DEVICES)
+
+
+def test_max_in_flight_caps_requests_across_the_fleet():
+    _, server = asyncio.run(_poll({"jitter": 0, "max_in_flight": 3}))
+    assert server.max_in_flight <= 3
+
+
+def test_own_session_is_kept_between_polls_and_closed_on_exit():
+    async def poll_twice():
+        app = web.Application()
+        app.router.add_get("/{auth_token}/get/{pin}", _Server().handler)
+        async with TestServer(app) as test_server:
+            url = str(test_server.make_url("/")) + "{auth_token}/get"
+            async with ClientSession() as shared:
+                async with PlaatoFleet(DEVICES, url, jitter=0,
+                                       session=shared) as fleet:
+                    await fleet.poll()
+                assert not shared.closed
+            fleet = PlaatoFleet(DEVICES, url, jitter=0)
+            async with fleet:
+                await fleet.poll()
+                session = fleet._get_session(None)
+                await fleet.poll()
+                assert session is fleet._get_session(None)
+                assert not session.closed
+            return session
+
+    assert asyncio.run(poll_twice()).closed
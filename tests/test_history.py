@@ -0,0 +1,57 @@
+import math
+
+import pytest
+
+from pyplaato.history import DeviceHistory, HistoryStore
+from pyplaato.models.airlock import PlaatoAirlock
+from pyplaato.models.device import PlaatoDeviceType
+from pyplaato.models.keg import PlaatoKeg
+
+pins = PlaatoAirlock.Pins
+
+
+def _history(readings, capacity=4):
+    history = DeviceHistory(PlaatoDeviceType.Airlock, capacity)
+    for timestamp, bpm in readings:
+        history.append(PlaatoAirlock({pins.BPM: bpm}), timestamp)
+    return history
+
+
+def test_oldest_readings_are_dropped_when_full():
+    history = _history([(t, str(t)) for t in range(6)])
+    assert 4 == len(history)
+    assert [2, 3, 4, 5] == list(history.timestamps())
+    assert [2, 3, 4, 5] == list(history.column(pins.BPM))
+    assert 5 == history.latest(pins.BPM)
+
+
+def test_time_range_slicing_across_the_wrap():
+    history = _history([(t, str(t)) for t in range(6)])
+    assert [3, 4] == list(history.column(pins.BPM, start=3, end=5))
+    assert [] == list(history.column(pins.BPM, start=10))
+
+
+def test_missing_and_invalid_values_are_nan():
+    history = _history([(0, None), (1, "junk")])
+    assert all(math.isnan(v) for v in history.column(pins.BPM))
+    assert math.isnan(history.column(pins.SG)[0])
+
+
+def test_downsample_averages_each_bucket():
+    history = _history([(0, "1"), (5, "3"), (10, None), (12, "10")], capacity=10)
+    assert [(0, 2), (10, 10)] == history.downsample(pins.BPM, 10)
+
+
+def test_readings_out_of_order_are_rejected():
+    history = _history([(5, "1")])
+    with pytest.raises(ValueError):
+        history.append(PlaatoAirlock({}), 4)
+
+
+def test_store_keeps_a_history_per_device():
+    store = HistoryStore(capacity=2)
+    store.append("keg", PlaatoKeg({PlaatoKeg.Pins.POURING: "255"}), 1)
+    store.append("airlock", PlaatoAirlock({}), 1)
+    assert 2 == len(store)
+    keg = store.get("keg", PlaatoDeviceType.Keg)
+    assert [1.0] == list(keg.column(PlaatoKeg.Pins.POURING))
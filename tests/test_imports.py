@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Microseconds an import may take, including the modules it imports
+MODELS_BUDGET = 50000
+CLIENT_BUDGET = 100000
+
+HEAVY = ("aiohttp", "dateutil", "email.utils")
+
+
+def _import_times(statement) -> dict:
+    """Cumulative microseconds per module imported by statement
+
+    The best of three runs is kept so a cold bytecode cache or a busy
+    machine does not count.
+    """
+    best = {}
+    for _ in range(3):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            capture_output=True, text=True, check=True, cwd=ROOT)
+        times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, module = line.split("|")
+            if cumulative.strip().isdigit():
+                times[module.strip()] = int(cumulative)
+        best = times if not best else {
+            module: min(value, best.get(module, value))
+            for module, value in times.items()
+        }
+    return best
+
+
+def test_models_import_without_heavy_dependencies():
+    times = _import_times(
+        "import pyplaato.models.keg, pyplaato.models.airlock")
+    assert not [module for module in times if module.startswith(HEAVY)]
+    assert times["pyplaato.models.keg"] < MODELS_BUDGET
+
+
+def test_client_import_does_not_load_aiohttp():
+    times = _import_times("import pyplaato.plaato, pyplaato.fleet")
+    assert not [module for module in times if module.startswith(HEAVY)]
+    assert times["pyplaato.plaato"] < CLIENT_BUDGET
+
+
+def test_constants_are_still_importable_from_plaato():
+    from pyplaato.plaato import ATTR_BPM, URL
+    assert "bpm" == ATTR_BPM
+    assert URL.startswith("http")
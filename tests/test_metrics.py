@@ -0,0 +1,92 @@
+import asyncio
+import math
+
+from pyplaato.metrics import MetricsHooks, MetricsRegistry, PlaatoHooks
+from pyplaato.mock import MockBlynkServer
+from pyplaato.models.device import PlaatoDeviceType
+from pyplaato.models.keg import PlaatoKeg
+from pyplaato.plaato import Plaato
+
+
+class _RecordingHooks(PlaatoHooks):
+    def __init__(self):
+        self.requests = []
+        self.decode_errors = []
+        self.polls = []
+
+    def on_request(self, pin, status, size, seconds):
+        self.requests.append((pin, status, size, seconds))
+
+    def on_decode_error(self, pin, error):
+        self.decode_errors.append(pin)
+
+    def on_poll(self, device_type, seconds, missing):
+        self.polls.append((device_type, seconds, missing))
+
+
+async def _get(server, hooks, **kwargs):
+    async with server, Plaato("token", server.url, hooks=hooks,
+                              **kwargs) as plaato:
+        return await plaato.get_data(None, PlaatoDeviceType.Keg)
+
+
+def test_hooks_see_every_request_and_poll():
+    hooks = _RecordingHooks()
+    asyncio.run(_get(MockBlynkServer(), hooks))
+    assert len(PlaatoKeg.pins()) == len(hooks.requests)
+    assert all(status == 200 and size > 0 and seconds >= 0
+               for _, status, size, seconds in hooks.requests)
+    assert [(PlaatoDeviceType.Keg, [])] == \
+        [(device_type, missing) for device_type, _, missing in hooks.polls]
+
+
+def test_hooks_see_failures_and_missing_pins():
+    hooks = _RecordingHooks()
+    asyncio.run(_get(MockBlynkServer(error_rate=1.0), hooks))
+    assert {500} == {status for _, status, _, _ in hooks.requests}
+    _, _, missing = hooks.polls[0]
+    assert set(PlaatoKeg.pins()) == set(missing)
+
+    hooks = _RecordingHooks()
+    asyncio.run(_get(MockBlynkServer(), hooks, json_loads=_fail))
+    assert set(PlaatoKeg.pins()) == set(hooks.decode_errors)
+
+
+def test_batched_requests_are_reported_without_pin():
+    hooks = _RecordingHooks()
+    asyncio.run(_get(MockBlynkServer(), hooks, batch=True))
+    assert [None] == [pin for pin, _, _, _ in hooks.requests]
+
+
+def test_metrics_hooks_record_into_registry():
+    hooks = MetricsHooks()
+    asyncio.run(_get(MockBlynkServer(error_rate=1.0), hooks))
+    pin = PlaatoKeg.Pins.BEER_NAME
+    assert 1 == hooks.responses.value(pin.value, "500")
+    assert 1 == hooks.request_seconds.count(pin.value)
+    assert 1 == hooks.poll_seconds.count("Keg")
+    assert 1 == hooks.missing_pins.value("Keg", pin.name)
+
+    text = hooks.registry.expose()
+    assert "# TYPE plaato_request_seconds histogram" in text
+    assert 'plaato_responses_total{pin="v64",status="500"} 1' in text
+    assert 'plaato_poll_seconds_bucket{device_type="Keg",le="+Inf"} 1' \
+        in text
+
+
+def test_histogram():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency", "Latency", ("host",),
+                                   buckets=(1, 2, 4))
+    for value in (0.5, 1.5, 1.5, 3, 10):
+        histogram.observe(value, "a")
+    assert 5 == histogram.count("a")
+    assert 16.5 == histogram.sum("a")
+    assert 1.75 == histogram.quantile(0.5, "a")
+    assert 4 == histogram.quantile(0.99, "a")
+    assert math.isnan(histogram.quantile(0.5, "b"))
+    assert 'latency_bucket{host="a",le="2"} 3' in registry.expose()
+
+
+def _fail(body):
+    raise ValueError("Not json")
@@ -0,0 +1,74 @@
+import asyncio
+
+from pyplaato.loadtest import percentile, run_load_test
+from pyplaato.mock import MockBlynkServer
+from pyplaato.models.device import PlaatoDeviceType
+from pyplaato.models.keg import PlaatoKeg
+from pyplaato.plaato import Plaato
+
+
+async def _get(server, device_type, headers=None, **kwargs):
+    async with server, \
+            Plaato("token", server.url, headers, **kwargs) as plaato:
+        return await plaato.get_data(None, device_type)
+
+
+def test_keg_and_airlock_pins_are_served():
+    server = MockBlynkServer(generators={
+        PlaatoKeg.Pins.BEER_LEFT: lambda auth_token: "12.5",
+    })
+    keg = asyncio.run(_get(server, PlaatoDeviceType.Keg))
+    assert "Beer token" == keg.name
+    assert 12.5 == keg.beer_left
+    assert len(PlaatoKeg.pins()) == server.requests
+
+    airlock = asyncio.run(_get(MockBlynkServer(), PlaatoDeviceType.Airlock))
+    assert 16 <= airlock.temperature <= 22
+
+
+def test_batched_requests_are_answered_at_once():
+    server = MockBlynkServer()
+    airlock = asyncio.run(_get(server, PlaatoDeviceType.Airlock, batch=True))
+    assert 1 == server.requests
+    assert 1.010 <= airlock.sg <= 1.050
+
+
+def test_errors_and_api_key():
+    server = MockBlynkServer(error_rate=1.0)
+    keg = asyncio.run(_get(server, PlaatoDeviceType.Keg))
+    assert keg.name is None
+    assert server.errors == server.requests
+
+    server = MockBlynkServer(api_key="secret")
+    assert asyncio.run(_get(server, PlaatoDeviceType.Keg)).name is None
+    keg = asyncio.run(_get(server, PlaatoDeviceType.Keg,
+                           {"x-api-key": "secret"}))
+    assert "Beer token" == keg.name
+
+
+def test_latency_is_applied():
+    server = MockBlynkServer(latency=lambda: 0.05)
+    result = asyncio.run(_load_test(server, devices=2, polls=2, batch=True))
+    assert 4 == result.polls
+    assert result.p50 >= 0.05
+
+
+def test_load_test_reports_throughput_and_percentiles():
+    server = MockBlynkServer(error_rate=0.5)
+    result = asyncio.run(_load_test(server, devices=5, polls=4))
+    assert 20 == result.polls
+    assert 20 * len(PlaatoKeg.pins()) == result.requests
+    assert 0 < result.failures <= 20
+    assert result.throughput > 0
+    assert result.p50 <= result.p99
+
+
+def test_percentile():
+    assert 2 == percentile([3, 1, 2], 50)
+    assert 100 == percentile(list(range(1, 101)), 99) + 1
+    assert percentile([], 50) != percentile([], 50)
+
+
+async def _load_test(server, **kwargs):
+    async with server:
+        return await run_load_test(server, **kwargs)
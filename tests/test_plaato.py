@@ -0,0 +1,268 @@
+import asyncio
+import time
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+
+from pyplaato.cache import PinCache
+from pyplaato.mock import MockBlynkServer
+from pyplaato.models.airlock import PlaatoAirlock
+from pyplaato.models.device import PlaatoDeviceType
+from pyplaato.models.keg import PlaatoKeg
+from pyplaato.plaato import Plaato, StreamPolicy
+from pyplaato.retry import CircuitBreaker, RetryPolicy
+
+DELAY = 0.1
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def _handler(request):
+    pin = request.match_info["pin"]
+    if pin == PlaatoKeg.Pins.BEER_NAME.value:
+        return web.json_response({"error": "Pin not found"})
+    if pin == PlaatoKeg.Pins.FIRMWARE_VERSION.value:
+        await asyncio.sleep(1)
+    await asyncio.sleep(DELAY)
+    return web.json_response([pin])
+
+
+async def _fetch(**kwargs):
+    app = web.Application()
+    app.router.add_get("/{auth_token}/get/{pin}", _handler)
+    async with TestServer(app) as server, ClientSession() as session:
+        url = str(server.make_url("/")) + "{auth_token}/get"
+        plaato = Plaato("token", url, **kwargs)
+        start = time.monotonic()
+        result = await plaato.fetch_pins(session, PlaatoKeg.pins())
+        return result, time.monotonic() - start
+
+
+def test_fetch_pins_runs_concurrently():
+    result, elapsed = run(_fetch(concurrency=len(PlaatoKeg.pins()), timeout=0.3))
+    assert elapsed < 0.3 + DELAY * 2
+    assert result[PlaatoKeg.Pins.POURING] == PlaatoKeg.Pins.POURING.value
+
+
+def test_fetch_pins_failed_and_timed_out_pins_are_none():
+    result, _ = run(_fetch(concurrency=len(PlaatoKeg.pins()), timeout=0.5))
+    assert result[PlaatoKeg.Pins.BEER_NAME] is None
+    assert result[PlaatoKeg.Pins.FIRMWARE_VERSION] is None
+    assert list(result.keys()) == PlaatoKeg.pins()
+
+
+def test_fetch_pins_respects_concurrency_limit():
+    _, elapsed = run(_fetch(concurrency=2, timeout=0.5))
+    assert elapsed >= DELAY * (len(PlaatoKeg.pins()) - 2) / 2
+
+
+class _BatchServer(object):
+    def __init__(self, supports_batch):
+        self.supports_batch = supports_batch
+        self.requests = 0
+
+    async def batch_handler(self, request):
+        self.requests += 1
+        if not self.supports_batch:
+            raise web.HTTPNotFound()
+        return web.json_response(
+            {key: [key] for key in request.query.keys()})
+
+    async def pin_handler(self, request):
+        self.requests += 1
+        return web.json_response([request.match_info["pin"]])
+
+
+async def _fetch_batch(supports_batch, polls=1):
+    server = _BatchServer(supports_batch)
+    app = web.Application()
+    app.router.add_get("/{auth_token}/get", server.batch_handler)
+    app.router.add_get("/{auth_token}/get/{pin}", server.pin_handler)
+    async with TestServer(app) as test_server, ClientSession() as session:
+        url = str(test_server.make_url("/")) + "{auth_token}/get"
+        plaato = Plaato("token", url, batch=True)
+        for _ in range(polls):
+            result = await plaato.fetch_pins(session, PlaatoKeg.pins())
+    return result, server.requests
+
+
+def test_fetch_pins_batched_uses_a_single_request():
+    result, requests = run(_fetch_batch(supports_batch=True))
+    assert requests == 1
+    assert result == {pin: pin.value for pin in PlaatoKeg.pins()}
+
+
+def test_fetch_pins_batched_falls_back_to_one_request_per_pin():
+    result, requests = run(_fetch_batch(supports_batch=False, polls=2))
+    assert requests == 1 + 2 * len(PlaatoKeg.pins())
+    assert result == {pin: pin.value for pin in PlaatoKeg.pins()}
+
+
+def test_fetch_pins_cached_pins_are_not_fetched_again():
+    cache = PinCache()
+
+    async def poll_twice():
+        server = _BatchServer(supports_batch=False)
+        app = web.Application()
+        app.router.add_get("/{auth_token}/get/{pin}", server.pin_handler)
+        async with TestServer(app) as test_server, ClientSession() as session:
+            url = str(test_server.make_url("/")) + "{auth_token}/get"
+            plaato = Plaato("token", url, cache=cache)
+            await plaato.fetch_pins(session, PlaatoKeg.pins())
+            requests = server.requests
+            result = await plaato.fetch_pins(session, PlaatoKeg.pins())
+        return result, server.requests - requests
+
+    result, requests = run(poll_twice())
+    cached = [pin for pin in PlaatoKeg.pins() if cache.is_cacheable(pin)]
+    assert requests == len(PlaatoKeg.pins()) - len(cached)
+    assert result[PlaatoKeg.Pins.BEER_NAME] == PlaatoKeg.Pins.BEER_NAME.value
+    assert cache.hits == len(cached)
+
+
+def test_context_manager_closes_only_its_own_session():
+    async def poll():
+        server = _BatchServer(supports_batch=False)
+        app = web.Application()
+        app.router.add_get("/{auth_token}/get/{pin}", server.pin_handler)
+        async with TestServer(app) as test_server, ClientSession() as shared:
+            url = str(test_server.make_url("/")) + "{auth_token}/get"
+            async with Plaato("token", url) as plaato:
+                keg = await plaato.get_keg_data()
+            async with Plaato("token", url, session=shared) as plaato:
+                await plaato.get_keg_data()
+            return keg, shared.closed
+
+    keg, shared_closed = run(poll())
+    assert keg.name == PlaatoKeg.Pins.BEER_NAME.value
+    assert not shared_closed
+
+
+class _FlakyServer(object):
+    def __init__(self, failures, status=503, headers=None):
+        self.failures = failures
+        self.status = status
+        self.headers = headers
+        self.requests = 0
+
+    async def handler(self, request):
+        self.requests += 1
+        if self.requests <= self.failures:
+            return web.Response(status=self.status, headers=self.headers)
+        return web.json_response([request.match_info["pin"]])
+
+
+async def _fetch_flaky(server, polls=1, **kwargs):
+    app = web.Application()
+    app.router.add_get("/{auth_token}/get/{pin}", server.handler)
+    async with TestServer(app) as test_server, ClientSession() as session:
+        url = str(test_server.make_url("/")) + "{auth_token}/get"
+        plaato = Plaato("token", url, session=session, **kwargs)
+        for _ in range(polls):
+            result = await plaato.fetch_pins(None, [PlaatoKeg.Pins.POURING])
+    return result[PlaatoKeg.Pins.POURING]
+
+
+def test_fetch_data_retries_transient_errors():
+    server = _FlakyServer(failures=2)
+    retry = RetryPolicy(attempts=3, base_delay=0.01)
+    assert PlaatoKeg.Pins.POURING.value == run(_fetch_flaky(server, retry=retry))
+    assert 3 == server.requests
+
+
+def test_fetch_data_honours_retry_after():
+    server = _FlakyServer(failures=1, status=429, headers={"Retry-After": "0"})
+    retry = RetryPolicy(attempts=2, base_delay=10)
+    assert PlaatoKeg.Pins.POURING.value == run(_fetch_flaky(server, retry=retry))
+
+
+def test_open_breaker_stops_requests_to_device():
+    server = _FlakyServer(failures=100)
+    retry = RetryPolicy(attempts=3, base_delay=0.01)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    assert run(_fetch_flaky(server, polls=3, retry=retry, breaker=breaker)) is None
+    assert 2 == server.requests
+
+
+def test_breaker_stops_pins_waiting_on_the_limiter():
+    server = _FlakyServer(failures=100)
+
+    async def poll():
+        app = web.Application()
+        app.router.add_get("/{auth_token}/get/{pin}", server.handler)
+        async with TestServer(app) as test_server, ClientSession() as session:
+            url = str(test_server.make_url("/")) + "{auth_token}/get"
+            plaato = Plaato("token", url, limiter=asyncio.Semaphore(1),
+                            breaker=CircuitBreaker(2, 60))
+            return await plaato.fetch_pins(session, PlaatoKeg.pins())
+
+    result = run(poll())
+    assert all(value is None for value in result.values())
+    assert 2 == server.requests
+
+
+def test_rate_limited_batch_is_not_fetched_pin_by_pin():
+    server = _BatchServer(supports_batch=True)
+
+    async def rate_limited(request):
+        server.requests += 1
+        return web.Response(status=429, headers={"Retry-After": "30"})
+
+    async def poll():
+        app = web.Application()
+        app.router.add_get("/{auth_token}/get", rate_limited)
+        app.router.add_get("/{auth_token}/get/{pin}", server.pin_handler)
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        async with TestServer(app) as test_server, ClientSession() as session:
+            url = str(test_server.make_url("/")) + "{auth_token}/get"
+            plaato = Plaato("token", url, batch=True, breaker=breaker)
+            result = await plaato.fetch_pins(session, PlaatoKeg.pins())
+        return result, breaker
+
+    result, breaker = run(poll())
+    assert all(value is None for value in result.values())
+    assert 1 == server.requests
+    assert breaker.is_open
+
+
+async def _stream(count, consume_delay=0.0, **kwargs):
+    server = MockBlynkServer(latency=0.02)
+    async with server, Plaato("token", server.url, batch=True) as plaato:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        received = []
+        stream = plaato.stream(None, PlaatoDeviceType.Airlock, **kwargs)
+        async for airlock in stream:
+            received.append((loop.time() - start, airlock))
+            if len(received) == count:
+                break
+            await asyncio.sleep(consume_delay)
+        await stream.aclose()
+        return received, server.requests
+
+
+def test_stream_polls_without_drift():
+    received, _ = run(_stream(4, interval=0.1))
+    times = [elapsed for elapsed, _ in received]
+    assert all(isinstance(airlock, PlaatoAirlock) for _, airlock in received)
+    # Each snapshot arrives the request latency after its slot on the grid
+    for index, elapsed in enumerate(times):
+        assert index * 0.1 + 0.02 <= elapsed < index * 0.1 + 0.08
+
+
+def test_stream_drop_keeps_only_latest_snapshot():
+    received, requests = run(_stream(
+        3, consume_delay=0.25, interval=0.05, policy=StreamPolicy.Drop))
+    assert 3 == len(received)
+    # Polling went on while the consumer was busy
+    assert requests >= 8
+
+
+def test_stream_buffer_stops_polling_when_full():
+    received, requests = run(_stream(
+        3, consume_delay=0.25, interval=0.05, policy=StreamPolicy.Buffer,
+        buffer_size=1))
+    assert 3 == len(received)
+    assert requests <= 5
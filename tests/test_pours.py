@@ -0,0 +1,59 @@
+import pytest
+
+from pyplaato.models.keg import PlaatoKeg
+from pyplaato.pours import PourDetector
+
+pins = PlaatoKeg.Pins
+
+
+def _keg(pouring="0", last_pour="0.5", beer_left="10", percent="50"):
+    return PlaatoKeg({
+        pins.POURING: pouring, pins.LAST_POUR: last_pour,
+        pins.BEER_LEFT: beer_left, pins.PERCENT_BEER_LEFT: percent
+    })
+
+
+def test_pour_is_reported_when_pouring_stops():
+    detector = PourDetector()
+    assert detector.update(_keg(), 0) is None
+    assert detector.update(_keg(pouring="255"), 10) is None
+    event = detector.update(_keg(last_pour="0.33", beer_left="9.67"), 15)
+    assert (10, 15, 5, 0.33) == \
+        (event.start, event.end, event.duration, event.volume)
+    assert 1 == detector.pours
+
+
+def test_late_last_pour_updates_the_estimated_event():
+    detector = PourDetector()
+    detector.update(_keg(), 0)
+    detector.update(_keg(pouring="255"), 10)
+    event = detector.update(_keg(beer_left="9.6"), 15)
+    assert 0.4 == event.volume
+    assert detector.update(_keg(last_pour="0.45", beer_left="9.6"), 20) is None
+    assert 0.45 == event.volume
+    assert 0.45 == pytest.approx(detector.volume)
+    assert 1 == detector.pours
+
+
+def test_pour_between_snapshots_is_found_through_last_pour():
+    detector = PourDetector()
+    detector.update(_keg(), 0)
+    event = detector.update(_keg(last_pour="0.4"), 60)
+    assert event.duration is None
+    assert 0.4 == event.volume
+
+
+def test_consumption_rate_and_time_until_empty():
+    detector = PourDetector()
+    detector.update(_keg(percent="50"), 0)
+    detector.update(_keg(percent="40"), 3600)
+    assert 10 == detector.percent_per_hour
+    assert 4 * 3600 == detector.seconds_until_empty
+
+
+def test_refill_restarts_consumption_tracking():
+    detector = PourDetector()
+    detector.update(_keg(percent="20"), 0)
+    detector.update(_keg(percent="100"), 3600)
+    assert detector.percent_per_hour is None
+    assert detector.seconds_until_empty is None
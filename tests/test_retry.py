@@ -0,0 +1,69 @@
+from pyplaato.retry import CircuitBreaker, RetryPolicy, parse_retry_after
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_delay_doubles_up_to_max_delay():
+    policy = RetryPolicy(base_delay=1, max_delay=5, jitter=False)
+    assert [1, 2, 4, 5] == [policy.delay(attempt) for attempt in range(4)]
+
+
+def test_delay_with_jitter_stays_below_backoff():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+    assert all(0 <= policy.delay(2) <= 4 for _ in range(100))
+
+
+def test_delay_uses_capped_retry_after():
+    policy = RetryPolicy(max_delay=5)
+    assert 3 == policy.delay(0, retry_after=3)
+    assert 5 == policy.delay(0, retry_after=60)
+
+
+def test_parse_retry_after():
+    assert 12 == parse_retry_after("12")
+    assert 0 > parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT")
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_timeout():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    clock.now = 10
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    clock.now = 20
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.allow_request()
+
+
+def test_half_open_breaker_lets_a_single_probe_through():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    clock.now = 20
+    assert breaker.allow_request()
+    # A probe that never reports back is replaced after another cool-down
+    clock.now = 30
+    assert breaker.allow_request()
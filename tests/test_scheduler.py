@@ -0,0 +1,95 @@
+import asyncio
+
+from pyplaato.models.device import PlaatoDeviceType
+from pyplaato.models.keg import PlaatoKeg
+from pyplaato.scheduler import PinScheduler
+
+pins = PlaatoKeg.Pins
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Plaato(object):
+    """Serves values from functions of the time"""
+
+    def __init__(self, clock, values):
+        self.clock = clock
+        self.values = values
+        self.requested = []
+
+    async def fetch_pins(self, session, pin_list):
+        self.requested.append(list(pin_list))
+        return {pin: self.values[pin](self.clock.now) for pin in pin_list}
+
+
+def _scheduler(values, **kwargs):
+    clock = _Clock()
+    plaato = _Plaato(clock, values)
+    scheduler = PinScheduler(plaato, PlaatoDeviceType.Keg, clock=clock,
+                             pins=list(values), **kwargs)
+    return clock, plaato, scheduler
+
+
+def _run_until(clock, scheduler, end):
+    while clock.now < end:
+        asyncio.run(scheduler.poll(None))
+        clock.now += max(scheduler.next_round, 0.5)
+
+
+def test_quiet_pins_back_off_and_busy_pins_stay_fast():
+    clock, plaato, scheduler = _scheduler({
+        pins.BEER_NAME: lambda now: "Lager",
+        pins.TEMPERATURE: lambda now: str(int(now // 4)),
+    }, min_interval=2, max_interval=300, bounds={})
+    _run_until(clock, scheduler, 3600)
+
+    assert 300 == scheduler.interval(pins.BEER_NAME)
+    assert 2 == scheduler.interval(pins.TEMPERATURE)
+    assert "Lager" == scheduler.values[pins.BEER_NAME]
+    polled = sum(pins.BEER_NAME in request for request in plaato.requested)
+    assert polled < 40
+
+
+def test_due_pins_are_merged_into_one_round():
+    clock, plaato, scheduler = _scheduler({
+        pins.BEER_NAME: lambda now: "Lager",
+        pins.TEMPERATURE: lambda now: "4",
+    }, merge_window=1, bounds={
+        pins.BEER_NAME: (10, 10), pins.TEMPERATURE: (10.5, 10.5)
+    })
+    asyncio.run(scheduler.poll(None))
+    clock.now = 10
+    asyncio.run(scheduler.poll(None))
+    assert [[pins.BEER_NAME, pins.TEMPERATURE]] * 2 == plaato.requested
+    assert [pins.BEER_NAME] == scheduler.due(19)
+
+
+def test_pour_wakes_related_pins_and_failures_retry_soon():
+    pouring = {"value": "0"}
+    clock, plaato, scheduler = _scheduler({
+        pins.POURING: lambda now: pouring["value"],
+        pins.LAST_POUR: lambda now: "0.3",
+        pins.BEER_LEFT: lambda now: None,
+    }, bounds={pins.POURING: (2, 30), pins.LAST_POUR: (2, 600),
+               pins.BEER_LEFT: (2, 600)})
+    _run_until(clock, scheduler, 600)
+    assert 30 == scheduler.interval(pins.POURING)
+    assert scheduler.interval(pins.LAST_POUR) > 100
+
+    pouring["value"] = "255"
+    clock.now += scheduler.next_round
+    while pins.POURING not in scheduler.due():
+        asyncio.run(scheduler.poll(None))
+        clock.now += scheduler.next_round
+    changes = asyncio.run(scheduler.poll(None))
+    assert {pins.POURING: ("0", "255")} == changes
+    assert pins.LAST_POUR in scheduler.due()
+    # The failing pin is retried after its min interval
+    assert pins.BEER_LEFT not in scheduler.values
+    assert pins.BEER_LEFT in scheduler.due(clock.now + 1)
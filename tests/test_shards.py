@@ -0,0 +1,58 @@
+import asyncio
+
+from pyplaato.loadtest import run_sharded_load_test
+from pyplaato.mock import MockBlynkServer, MockServerPool
+from pyplaato.models.airlock import PlaatoAirlock
+from pyplaato.models.device import PlaatoDeviceType
+from pyplaato.models.keg import PlaatoKeg
+from pyplaato.shards import ShardedFleet, split
+
+DEVICES = [
+    ("keg-1", PlaatoDeviceType.Keg),
+    ("keg-2", PlaatoDeviceType.Keg),
+    ("airlock-1", PlaatoDeviceType.Airlock),
+]
+
+
+async def _poll(**kwargs):
+    async with MockBlynkServer() as server, \
+            ShardedFleet(DEVICES, 2, server.url, **kwargs) as fleet:
+        raw = await fleet.poll_raw()
+        devices = await fleet.poll()
+    return fleet, raw, devices, server
+
+
+def test_split_deals_devices_round_robin():
+    assert [[1, 3, 5], [2, 4]] == split([1, 2, 3, 4, 5], 2)
+    assert [[1], [2]] == split([1, 2], 8)
+
+
+def test_workers_send_pin_values_and_models_are_built_by_the_caller():
+    fleet, raw, devices, server = asyncio.run(_poll(batch=True))
+    assert [["keg-1", "airlock-1"], ["keg-2"]] == \
+        [[token for token, _ in shard] for shard in fleet.shards]
+    assert len(PlaatoKeg.pins()) == len(raw["keg-1"])
+    assert "Beer keg-1" == raw["keg-1"][0]
+    assert isinstance(devices["keg-2"], PlaatoKeg)
+    assert "Beer keg-2" == devices["keg-2"].name
+    assert isinstance(devices["airlock-1"], PlaatoAirlock)
+    assert 16 <= devices["airlock-1"].temperature <= 22
+    # One batched request per device and poll
+    assert 6 == server.requests
+
+
+def test_build_keeps_failed_devices_as_none():
+    fleet = ShardedFleet(DEVICES, 2)
+    assert fleet.build("keg-1", None) is None
+    keg = fleet.build("keg-1", (None,) * len(PlaatoKeg.pins()))
+    assert keg.beer_left is None
+
+
+def test_sharded_load_test_against_server_processes():
+    with MockServerPool(2) as pool:
+        result = asyncio.run(run_sharded_load_test(
+            pool.url, PlaatoDeviceType.Airlock, devices=4, polls=2,
+            shards=2, batch=True))
+    assert 8 == result.polls
+    assert 0 == result.failures
+    assert 12 == pool.requests
@@ -0,0 +1,80 @@
+import pytest
+
+from pyplaato.models.airlock import PlaatoAirlock
+from pyplaato.models.device import PlaatoDeviceType
+from pyplaato.models.keg import PlaatoKeg
+from pyplaato.snapshots import SnapshotReader, SnapshotWriter
+
+KEG = {PlaatoKeg.Pins.BEER_NAME: "IPA", PlaatoKeg.Pins.BEER_LEFT: "9.5",
+       PlaatoKeg.Pins.DATE: None}
+AIRLOCK = {PlaatoAirlock.Pins.BPM: "12"}
+
+
+def _write(path):
+    with SnapshotWriter(path) as writer:
+        writer.write("keg", PlaatoDeviceType.Keg, KEG, 1)
+        writer.write("airlock", PlaatoDeviceType.Airlock, AIRLOCK, 1)
+    with SnapshotWriter(path) as writer:
+        writer.write("keg", PlaatoDeviceType.Keg, KEG, 2)
+
+
+def test_snapshots_are_replayed_in_order(tmp_path):
+    path = tmp_path / "fleet.log"
+    _write(path)
+    with SnapshotReader(path) as reader:
+        snapshots = list(reader.snapshots())
+    assert [("keg", 1), ("airlock", 1), ("keg", 2)] == \
+        [(s.device_id, s.timestamp) for s in snapshots]
+    assert KEG == snapshots[0].values
+    assert isinstance(snapshots[0].device, PlaatoKeg)
+    assert "IPA" == snapshots[0].device.name
+    assert isinstance(snapshots[1].device, PlaatoAirlock)
+
+
+def test_readings_are_filtered_by_time_and_device(tmp_path):
+    path = tmp_path / "fleet.log"
+    _write(path)
+    with SnapshotReader(path) as reader:
+        assert [("keg", PlaatoKeg.Pins.BEER_NAME, 2, "IPA")] == [
+            r for r in reader.readings(start=2)
+            if r[1] == PlaatoKeg.Pins.BEER_NAME]
+        assert {"airlock"} == \
+            {r[0] for r in reader.readings(end=2, device_id="airlock")}
+
+
+def test_record_cut_short_at_the_end_is_ignored(tmp_path):
+    path = tmp_path / "fleet.log"
+    _write(path)
+    with open(path, "ab") as f:
+        f.write(b"\x01\x00\x00")
+    with SnapshotReader(path) as reader:
+        assert 3 == len(list(reader.snapshots()))
+
+
+def test_reopening_drops_a_record_cut_short(tmp_path):
+    path = tmp_path / "fleet.log"
+    _write(path)
+    with open(path, "r+b") as f:
+        f.truncate(path.stat().st_size - 3)
+    with SnapshotWriter(path) as writer:
+        writer.write("keg", PlaatoDeviceType.Keg, KEG, 3)
+    with SnapshotReader(path) as reader:
+        snapshots = list(reader.snapshots())
+        assert reader.end == path.stat().st_size
+    assert [1, 1, 2, 3] == [s.timestamp for s in snapshots]
+    assert PlaatoKeg.Pins.DATE not in snapshots[2].values
+    assert KEG == snapshots[3].values
+
+
+def test_values_too_long_are_rejected(tmp_path):
+    with SnapshotWriter(tmp_path / "fleet.log") as writer:
+        with pytest.raises(ValueError):
+            writer.write("keg", PlaatoDeviceType.Keg,
+                         {PlaatoKeg.Pins.BEER_NAME: "x" * 0xFFFF}, 1)
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "other.log"
+    path.write_bytes(b"{}")
+    with pytest.raises(ValueError):
+        SnapshotReader(path)
@@ -0,0 +1,56 @@
+import asyncio
+
+from pyplaato.models.device import PlaatoDeviceType
+from pyplaato.models.keg import PlaatoKeg
+from pyplaato.watcher import PlaatoWatcher
+
+pins = PlaatoKeg.Pins
+
+
+class _Plaato(object):
+    def __init__(self, *polls):
+        self.polls = list(polls)
+
+    async def fetch_pins(self, session, pin_list):
+        values = self.polls.pop(0)
+        return {pin: values.get(pin, None) for pin in pin_list}
+
+
+def _watch(plaato, **kwargs):
+    watcher = PlaatoWatcher(plaato, PlaatoDeviceType.Keg, **kwargs)
+    changes = []
+    watcher.subscribe(lambda *change: changes.append(change), [pins.POURING])
+    return watcher, changes
+
+
+def test_poll_only_reports_changed_pins():
+    watcher, changes = _watch(_Plaato(
+        {pins.POURING: "0", pins.BEER_LEFT: "10"},
+        {pins.POURING: "0", pins.BEER_LEFT: "9"},
+        {pins.POURING: "255", pins.BEER_LEFT: "9"},
+    ))
+    assert {pins.POURING: (None, "0"), pins.BEER_LEFT: (None, "10")} \
+        == asyncio.run(watcher.poll(None))
+    assert {pins.BEER_LEFT: ("10", "9")} == asyncio.run(watcher.poll(None))
+    assert {pins.POURING: ("0", "255")} == asyncio.run(watcher.poll(None))
+    assert [(pins.POURING, None, "0"), (pins.POURING, "0", "255")] == changes
+
+
+def test_failed_pin_keeps_last_known_value():
+    watcher, changes = _watch(_Plaato({pins.POURING: "0"}, {}))
+    asyncio.run(watcher.poll(None))
+    assert {} == asyncio.run(watcher.poll(None))
+    assert "0" == watcher.values[pins.POURING]
+
+
+def test_interval_follows_pouring_and_idle_state():
+    watcher, _ = _watch(
+        _Plaato({pins.POURING: "255"}, {pins.POURING: "0"}, {pins.POURING: "0"}),
+        interval=10, active_interval=1, idle_interval=100, idle_after=1
+    )
+    asyncio.run(watcher.poll(None))
+    assert 1 == watcher.next_interval
+    asyncio.run(watcher.poll(None))
+    assert 10 == watcher.next_interval
+    asyncio.run(watcher.poll(None))
+    assert 100 == watcher.next_interval
@@ -0,0 +1,58 @@
+import asyncio
+
+from aiohttp import ClientSession
+from aiohttp.test_utils import TestServer
+
+from pyplaato.const import ATTR_BPM, ATTR_DEVICE_ID, ATTR_POURING
+from pyplaato.models.airlock import PlaatoAirlock
+from pyplaato.models.device import PlaatoDeviceType
+from pyplaato.models.keg import PlaatoKeg
+from pyplaato.webhook import PlaatoWebhookReceiver
+
+
+async def _post(receiver, *payloads):
+    responses = []
+    async with TestServer(receiver.create_app()) as server, \
+            ClientSession() as session:
+        for payload in payloads:
+            async with session.post(server.make_url("/plaato"),
+                                    json=payload) as resp:
+                responses.append((resp.status, await resp.json()))
+    items = []
+    while not receiver.queue.empty():
+        items.append(receiver.queue.get_nowait())
+    return responses, items
+
+
+def test_single_and_batched_webhooks_are_queued():
+    receiver = PlaatoWebhookReceiver()
+    responses, items = asyncio.run(_post(
+        receiver,
+        {ATTR_DEVICE_ID: "1", ATTR_BPM: "10"},
+        [{ATTR_DEVICE_ID: "2", ATTR_BPM: "20"}, {ATTR_DEVICE_ID: "3"}],
+    ))
+    assert [200, 200] == [status for status, _ in responses]
+    assert ["1", "2", "3"] == [device_id for device_id, _ in items]
+    assert isinstance(items[0][1], PlaatoAirlock)
+    assert "20" == items[1][1].bmp
+
+
+def test_keg_webhooks_are_parsed_into_kegs():
+    receiver = PlaatoWebhookReceiver(PlaatoDeviceType.Keg)
+    _, items = asyncio.run(_post(receiver, {ATTR_POURING: "255"}))
+    assert isinstance(items[0][1], PlaatoKeg)
+    assert items[0][1].pouring
+
+
+def test_invalid_payload_is_rejected():
+    receiver = PlaatoWebhookReceiver()
+    responses, items = asyncio.run(_post(receiver, [1, 2]))
+    assert 400 == responses[0][0]
+    assert [] == items
+
+
+def test_full_queue_answers_service_unavailable():
+    receiver = PlaatoWebhookReceiver(queue_size=1, put_timeout=0.01)
+    responses, items = asyncio.run(_post(receiver, [{}, {}]))
+    assert (503, {"accepted": 1}) == responses[0]
+    assert 1 == len(items)